@@ -0,0 +1,154 @@
+import hashlib
+import json
+import os
+import numpy as np
+from typing import List, Optional, Tuple
+
+INDEX_FORMAT_VERSION = 2
+
+def top_k_rows(scores: np.ndarray, k: int) -> np.ndarray:
+    """Return the positions of the k highest scores, best first."""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    top = np.argpartition(-scores, k - 1)[:k] if k < len(scores) else np.arange(len(scores))
+    return top[np.argsort(-scores[top], kind='stable')]
+
+def catalog_fingerprint(job_keys: List[str]) -> str:
+    """Hash of the catalog rows (in order) an index was built for."""
+    return hashlib.sha1('\n'.join(job_keys).encode('utf-8')).hexdigest()
+
+class IVFIndex:
+    """Inverted-file (IVF) approximate nearest-neighbour index.
+
+    Job vectors are clustered by direction with spherical k-means into
+    n_lists inverted lists, stored contiguously per list. The vectors keep
+    their norms, so search is by inner product. A query scores the centroids
+    and only scans the n_probe closest lists, so n_lists and n_probe are the
+    recall/latency knobs: more probes means higher recall and more work.
+    """
+    def __init__(self, centroids: np.ndarray, list_offsets: np.ndarray, row_ids: np.ndarray,
+                 vectors: np.ndarray, n_probe: int = 32, fingerprint: str = ""):
+        self.centroids = centroids
+        self.list_offsets = list_offsets
+        self.row_ids = row_ids
+        self.vectors = vectors
+        self.n_probe = n_probe
+        self.fingerprint = fingerprint
+
+    @property
+    def n_lists(self) -> int:
+        return len(self.centroids)
+
+    @classmethod
+    def build(cls, embeddings: np.ndarray, n_lists: Optional[int] = None, n_probe: int = 32,
+              n_iter: int = 10, train_size: int = 100000, seed: int = 0, fingerprint: str = "") -> 'IVFIndex':
+        """Train centroids on a sample of embeddings and fill the inverted lists."""
+        n_rows = len(embeddings)
+        if n_rows == 0:
+            # An empty catalog (e.g. after deleting every job) gets an index with no lists
+            dim = embeddings.shape[1] if embeddings.ndim == 2 else 0
+            empty = np.empty((0, dim), dtype=np.float32)
+            return cls(empty, np.zeros(1, dtype=np.int64), np.empty(0, dtype=np.int64), empty, n_probe, fingerprint)
+        if n_lists is None:
+            n_lists = int(np.sqrt(n_rows))
+        n_lists = max(1, min(n_lists, n_rows))
+
+        rng = np.random.default_rng(seed)
+        sample = embeddings
+        if n_rows > train_size:
+            sample = embeddings[np.sort(rng.choice(n_rows, train_size, replace=False))]
+        # Cluster on directions; assignment by argmax is unaffected by row norms
+        norms = np.linalg.norm(sample, axis=1, keepdims=True)
+        sample = sample / np.where(norms > 0, norms, 1.0)
+
+        # Spherical k-means: assign by inner product, renormalize the means
+        centroids = np.array(sample[rng.choice(len(sample), n_lists, replace=False)], dtype=np.float32)
+        for _ in range(n_iter):
+            assignment = cls._assign(sample, centroids)
+            order = np.argsort(assignment, kind='stable')
+            counts = np.bincount(assignment, minlength=n_lists)
+            starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+            sums = np.zeros_like(centroids)
+            filled = counts > 0
+            sums[filled] = np.add.reduceat(sample[order], starts[filled], axis=0)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            empty = norms[:, 0] == 0
+            # Keep the previous centroid for lists that lost every member
+            sums[empty] = centroids[empty]
+            norms[empty] = 1.0
+            centroids = (sums / norms).astype(np.float32)
+
+        assignment = cls._assign(embeddings, centroids)
+        order = np.argsort(assignment, kind='stable')
+        counts = np.bincount(assignment, minlength=n_lists)
+        list_offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        vectors = np.ascontiguousarray(embeddings[order], dtype=np.float32)
+
+        return cls(centroids, list_offsets, order.astype(np.int64), vectors, n_probe, fingerprint)
+
+    @staticmethod
+    def _assign(embeddings: np.ndarray, centroids: np.ndarray, chunk_size: int = 65536) -> np.ndarray:
+        """Nearest centroid for each row, computed in chunks to bound memory."""
+        assignment = np.empty(len(embeddings), dtype=np.int64)
+        for start in range(0, len(embeddings), chunk_size):
+            chunk = embeddings[start:start + chunk_size]
+            assignment[start:start + chunk_size] = np.argmax(chunk @ centroids.T, axis=1)
+        return assignment
+
+    def search(self, query: np.ndarray, k: int, n_probe: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (rows, similarities) of approximately the k nearest jobs, best first."""
+        n_probe = min(n_probe or self.n_probe, self.n_lists)
+        probes = top_k_rows(self.centroids @ query, n_probe)
+
+        positions = [np.arange(self.list_offsets[l], self.list_offsets[l + 1]) for l in probes]
+        positions = np.concatenate(positions) if positions else np.empty(0, dtype=np.int64)
+        if len(positions) == 0:
+            return positions, np.empty(0, dtype=np.float32)
+
+        scores = self.vectors[positions] @ query
+        top = top_k_rows(scores, k)
+        return self.row_ids[positions[top]], scores[top]
+
+    def save(self, directory: str):
+        """Persist the index as .npy arrays plus a small JSON manifest."""
+        os.makedirs(directory, exist_ok=True)
+        for name in ('centroids', 'list_offsets', 'row_ids', 'vectors'):
+            np.save(os.path.join(directory, f'{name}.npy'), getattr(self, name))
+        manifest = {
+            'format_version': INDEX_FORMAT_VERSION,
+            'n_lists': self.n_lists,
+            'n_probe': self.n_probe,
+            'count': int(len(self.row_ids)),
+            'dim': int(self.vectors.shape[1]),
+            'fingerprint': self.fingerprint
+        }
+        # Write the manifest last so a partial save is never loaded
+        tmp_path = os.path.join(directory, 'index.json.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, os.path.join(directory, 'index.json'))
+
+    @classmethod
+    def load(cls, directory: str, n_probe: Optional[int] = None, fingerprint: Optional[str] = None) -> Optional['IVFIndex']:
+        """Load a saved index memory-mapped; returns None if it is missing or stale."""
+        manifest_path = os.path.join(directory, 'index.json')
+        if not os.path.exists(manifest_path):
+            return None
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        if manifest.get('format_version') != INDEX_FORMAT_VERSION:
+            return None
+        if fingerprint is not None and manifest.get('fingerprint') != fingerprint:
+            return None
+
+        arrays = {
+            name: np.load(os.path.join(directory, f'{name}.npy'), mmap_mode='r')
+            for name in ('centroids', 'list_offsets', 'row_ids', 'vectors')
+        }
+        # Centroids and offsets are small and read on every query
+        return cls(
+            np.array(arrays['centroids']), np.array(arrays['list_offsets']),
+            arrays['row_ids'], arrays['vectors'],
+            n_probe or manifest['n_probe'], manifest['fingerprint']
+        )
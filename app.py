@@ -1,75 +1,178 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Request, Response, g, request, jsonify
 from flask_cors import CORS
-from werkzeug.utils import secure_filename
+import hmac
+import io
+import logging
 import os
+import time
+import uuid
+from catalog_sync import CatalogChangeLog, CatalogSync
 from job_matcher import JobMatcher
 from resume_processor import ResumeProcessor
+from result_cache import ResultCache
+import metrics
+from metrics import stage
+
+class InMemoryRequest(Request):
+    """Keep uploaded files in memory instead of spooling them to temp files.
+
+    MAX_CONTENT_LENGTH bounds the size of each buffer.
+    """
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return io.BytesIO()
 
 app = Flask(__name__)
+app.request_class = InMemoryRequest
 CORS(app)
-app.config['UPLOAD_FOLDER'] = 'uploads'
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024
+MAX_BATCH_PROFILES = 1000
+MAX_CATALOG_CHANGES = 1000
+MAX_CATALOG_GAP_LIMIT = 100
+
+logging.basicConfig(level=os.environ.get('LOG_LEVEL', 'INFO'), format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+logger = logging.getLogger('job_matcher.app')
+
+# Opt-in: keep sampled stacks of requests slower than JOB_MATCHER_PROFILE_SLOW_MS
+profile_slow_ms = os.environ.get('JOB_MATCHER_PROFILE_SLOW_MS')
+profiler = metrics.SlowRequestProfiler(
+    threshold_ms=float(profile_slow_ms),
+    sample_rate=float(os.environ.get('JOB_MATCHER_PROFILE_SAMPLE_RATE', 1.0)),
+    output_dir=os.environ.get('JOB_MATCHER_PROFILE_DIR', 'profiles')
+) if profile_slow_ms else None
 
 # Initialize components
-print("Initializing components...")
-job_matcher = JobMatcher()
-print("JobMatcher initialized")
-resume_processor = ResumeProcessor()
-print("ResumeProcessor initialized")
+logger.info("Initializing components...")
+# Job embeddings are cached on disk in JOB_MATCHER_STORE_DIR across restarts.
+# Set JOB_MATCHER_ONET_STORE to a store built by onet_store.py to serve the real
+# O*NET catalog, and JOB_MATCHER_INDEX_DIR to serve large catalogs from the ANN index.
+job_matcher = JobMatcher(
+    index_dir=os.environ.get('JOB_MATCHER_INDEX_DIR'),
+    store_dir=os.environ.get('JOB_MATCHER_STORE_DIR', 'embedding_store'),
+    onet_store=os.environ.get('JOB_MATCHER_ONET_STORE')
+)
+# Coalesce concurrent user encodes from all request threads into batched model calls
+job_matcher.enable_micro_batching(
+    max_batch_size=int(os.environ.get('JOB_MATCHER_MAX_BATCH_SIZE', 32)),
+    max_wait_ms=float(os.environ.get('JOB_MATCHER_MAX_WAIT_MS', 5))
+)
+logger.info("JobMatcher initialized")
+# Durable match results and sessions; set JOB_MATCHER_DB to an empty string to disable
+db_path = os.environ.get('JOB_MATCHER_DB', 'job_matcher.db')
+# Admin catalog updates are logged in the same database and replayed by every
+# worker; replaying here, before the result cache opens, restores them after a restart
+catalog_sync = CatalogSync(
+    job_matcher, CatalogChangeLog(db_path),
+    poll_seconds=float(os.environ.get('JOB_MATCHER_CATALOG_POLL_SECONDS', 2))
+) if db_path else None
+if catalog_sync:
+    compacted = catalog_sync.change_log.compact()
+    if compacted:
+        logger.info("Removed %d superseded catalog changes", compacted)
+    catalog_sync.sync()
+    logger.info("Catalog change log replayed up to entry %d", catalog_sync.applied_seq)
+result_cache = ResultCache(
+    db_path, job_matcher.catalog_version, job_matcher.model_version,
+    max_rows=int(os.environ.get('JOB_MATCHER_RESULT_CACHE_MAX_ROWS', 100000))
+) if db_path else None
+if catalog_sync:
+    # Drop results of replaced catalog versions as soon as this process moves on
+    catalog_sync.on_update = result_cache.set_catalog_version
+logger.info("ResultCache initialized")
+# Extraction stops at whichever cap a resume reaches first
+resume_processor = ResumeProcessor(
+    max_pages=int(os.environ.get('JOB_MATCHER_MAX_PAGES', 50)),
+    max_chars=int(os.environ.get('JOB_MATCHER_MAX_CHARS', 200000))
+)
+logger.info("ResumeProcessor initialized")
+
+logger.info("All components ready!")
+
+# Bearer token for the /admin endpoints; they are disabled when it is unset
+admin_token = os.environ.get('JOB_MATCHER_ADMIN_TOKEN')
+
+# Set by warm_up(); /ready reports 503 until then
+warm_up_seconds = None
+
+def warm_up():
+    """Exercise the model and indexes once so the first request is fast.
 
-print("All components ready!")
+    Under gunicorn (gunicorn.conf.py) this runs in the master before workers
+    fork, so the warmed model and embeddings are shared copy-on-write.
+    """
+    global warm_up_seconds
+    start = time.perf_counter()
+    job_matcher.warm_up()
+    resume_processor.extract_skills("Python, SQL and communication")
+    warm_up_seconds = time.perf_counter() - start
+    logger.info("Warm-up complete in %.2fs", warm_up_seconds)
 
-# Ensure upload directory exists
-os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+def respond(payload: dict):
+    """JSON response with serialization timed as its own stage."""
+    with stage('serialization'):
+        return jsonify(payload)
 
+@app.before_request
+def start_request_timer():
+    g.request_start = time.perf_counter()
+    if catalog_sync:
+        # Workers fork without threads, so each starts its own poller on first request
+        catalog_sync.ensure_poller()
+    if profiler:
+        profiler.start()
 
+@app.after_request
+def record_request(response):
+    start = g.pop('request_start', None)
+    if start is not None:
+        elapsed = time.perf_counter() - start
+        endpoint = request.endpoint or 'unknown'
+        if metrics.enabled:
+            metrics.REQUEST_SECONDS.labels(endpoint, str(response.status_code)).observe(elapsed)
+        if profiler:
+            path = profiler.stop(endpoint, elapsed * 1000)
+            if path:
+                logger.warning("Slow request %s took %.0f ms; profile saved to %s", endpoint, elapsed * 1000, path)
+    return response
 
 @app.route('/upload_resume', methods=['POST'])
 def upload_resume():
     try:
-        print("Upload request received")
+        logger.debug("Upload request received")
         
-        if 'resume' not in request.files:
+        # Parsing the multipart body reads the upload into memory
+        with stage('upload_read'):
+            files = request.files
+        if 'resume' not in files:
             return jsonify({'error': 'No file uploaded'}), 400
         
-        file = request.files['resume']
+        file = files['resume']
         if file.filename == '':
             return jsonify({'error': 'No file selected'}), 400
         
         if file and allowed_file(file.filename):
-            # Save file
-            filename = secure_filename(file.filename)
-            filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            print(f"Saving file to: {filepath}")
-            file.save(filepath)
-            
-            # Extract text from resume
-            print("Extracting text...")
-            resume_text = resume_processor.extract_text(filepath)
-            print(f"Extracted text length: {len(resume_text)}")
+            # Extract text straight from the in-memory upload stream
+            file_extension = file.filename.rsplit('.', 1)[1]
+            extraction = resume_processor.extract_text_with_stats(file.stream, file_extension)
+            resume_text = extraction['text']
+            logger.debug("Extracted text length: %d from %d page(s)", len(resume_text), extraction['pages'])
             
             # Extract skills from resume
-            print("Extracting skills...")
             extracted_skills = resume_processor.extract_skills(resume_text)
-            print(f"Extracted skills: {extracted_skills}")
-            
-
-            
-            # Clean up file
-            os.remove(filepath)
+            logger.debug("Extracted skills: %s", extracted_skills)
             
-            return jsonify({
+            return respond({
                 'success': True,
                 'extracted_skills': extracted_skills,
-                'resume_text': resume_text[:500] + '...' if len(resume_text) > 500 else resume_text
+                'resume_text': resume_text[:500] + '...' if len(resume_text) > 500 else resume_text,
+                'pages_processed': extraction['pages'],
+                'page_times_ms': extraction['page_times_ms'],
+                'truncated': extraction['truncated']
             })
         
         return jsonify({'error': 'Invalid file format'}), 400
     
     except Exception as e:
-        print(f"Error in upload_resume: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error in upload_resume")
         return jsonify({'error': str(e)}), 500
 
 @app.route('/match_jobs', methods=['POST'])
@@ -82,15 +185,61 @@ def match_jobs():
         if not skills:
             return jsonify({'error': 'No skills provided'}), 400
         
-        # Get job matches
-        job_matches = job_matcher.find_matches(skills, job_preference)
+        if result_cache is None:
+            return respond({
+                'success': True,
+                'job_matches': job_matcher.find_matches(skills, job_preference)
+            })
         
-
+        # Pin one catalog snapshot so the cache key matches the results
+        snapshot = job_matcher.snapshot
+        # Repeat queries are served from the result cache without running the model
+        cache_key = result_cache.key(skills, job_preference, catalog_version=snapshot.catalog_version)
+        job_matches = result_cache.get_matches(cache_key)
+        if job_matches is None:
+            job_matches = job_matcher.find_matches(skills, job_preference, snapshot=snapshot)
+            result_cache.put_matches(cache_key, job_matches, snapshot.catalog_version)
+        
+        session_id = valid_session_id(data.get('session_id')) or uuid.uuid4().hex
+        result_cache.save_session(session_id, skills, job_matches)
         
-        return jsonify({
+        return respond({
             'success': True,
             'job_matches': job_matches,
+            'session_id': session_id
+        })
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
 
+@app.route('/match_jobs_batch', methods=['POST'])
+def match_jobs_batch():
+    try:
+        data = request.get_json()
+        profiles = data.get('profiles', [])
+        
+        if not isinstance(profiles, list):
+            return jsonify({'error': 'profiles must be a list'}), 400
+        if not profiles:
+            return jsonify({'error': 'No profiles provided'}), 400
+        if len(profiles) > MAX_BATCH_PROFILES:
+            return jsonify({'error': f'At most {MAX_BATCH_PROFILES} profiles per request'}), 400
+        if not all(isinstance(profile, dict) for profile in profiles):
+            return jsonify({'error': 'Every profile must be an object'}), 400
+        if any(not profile.get('skills') for profile in profiles):
+            return jsonify({'error': 'Every profile needs skills'}), 400
+        if not all(isinstance(profile['skills'], list) and all(isinstance(skill, str) for skill in profile['skills'])
+                   for profile in profiles):
+            return jsonify({'error': 'Profile skills must be a list of strings'}), 400
+        if not all(isinstance(profile.get('job_preference', ''), str) for profile in profiles):
+            return jsonify({'error': 'Profile job_preference must be a string'}), 400
+        
+        # One batched encode and matrix scoring pass for all profiles
+        job_matches = job_matcher.find_matches_batch(profiles)
+        
+        return respond({
+            'success': True,
+            'job_matches': job_matches
         })
     
     except Exception as e:
@@ -109,7 +258,7 @@ def get_skill_gap():
         # Get skill gap analysis
         skill_gap = job_matcher.analyze_skill_gap(job_id, user_skills)
         
-        return jsonify({
+        return respond({
             'success': True,
             'skill_gap': skill_gap
         })
@@ -117,6 +266,30 @@ def get_skill_gap():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/get_catalog_gap', methods=['POST'])
+def get_catalog_gap():
+    try:
+        data = request.get_json()
+        user_skills = data.get('skills', [])
+        limit = data.get('limit', 10)
+        
+        if not user_skills:
+            return jsonify({'error': 'No skills provided'}), 400
+        if not isinstance(limit, int) or isinstance(limit, bool):
+            return jsonify({'error': 'limit must be an integer'}), 400
+        limit = min(max(limit, 1), MAX_CATALOG_GAP_LIMIT)
+        
+        # Skill coverage of every job in one vectorized pass
+        jobs = job_matcher.catalog_skill_gap(user_skills, limit)
+        
+        return respond({
+            'success': True,
+            'jobs': jobs
+        })
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/get_suggestions', methods=['POST'])
 def get_suggestions():
     try:
@@ -125,7 +298,7 @@ def get_suggestions():
         
         suggestions = job_matcher.get_skill_suggestions(query)
         
-        return jsonify({
+        return respond({
             'success': True,
             'suggestions': suggestions
         })
@@ -133,14 +306,135 @@ def get_suggestions():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def valid_session_id(session_id) -> str:
+    """session_id in canonical form if it is a UUID like the ones /match_jobs issues, else ''."""
+    if not isinstance(session_id, str):
+        return ''
+    try:
+        return uuid.UUID(session_id).hex
+    except ValueError:
+        return ''
+
+def admin_error():
+    """Error response unless the request carries the admin bearer token."""
+    if not admin_token:
+        return jsonify({'error': 'Admin API is disabled'}), 404
+    supplied = request.headers.get('Authorization', '')
+    if not hmac.compare_digest(supplied.encode('utf-8'), f'Bearer {admin_token}'.encode('utf-8')):
+        return jsonify({'error': 'Unauthorized'}), 401
+    return None
+
+def catalog_info() -> dict:
+    snapshot = job_matcher.snapshot
+    return {
+        'catalog_version': snapshot.catalog_version,
+        'snapshot_version': snapshot.version,
+        'jobs': snapshot.n_live,
+        'rows': len(snapshot.job_ids),
+        'unindexed_rows': len(snapshot.unindexed_rows),
+        'applied_seq': catalog_sync.applied_seq if catalog_sync else None
+    }
+
+def apply_catalog_changes(changes: dict):
+    """Log (when the database is enabled) and apply job upserts and deletions."""
+    if not changes:
+        return jsonify({'error': 'No changes provided'}), 400
+    if len(changes) > MAX_CATALOG_CHANGES:
+        return jsonify({'error': f'At most {MAX_CATALOG_CHANGES} jobs per request'}), 400
+    try:
+        if catalog_sync:
+            catalog_sync.publish(changes)
+        else:
+            job_matcher.update_catalog(changes)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    logger.info("Catalog updated: %d job(s) changed", len(changes))
+    return respond({'success': True, **catalog_info()})
+
+@app.route('/admin/jobs', methods=['POST'])
+def upsert_jobs():
+    error = admin_error()
+    if error:
+        return error
+    try:
+        data = request.get_json()
+        jobs = data.get('jobs', {})
+        if not isinstance(jobs, dict) or any(not isinstance(job, dict) for job in jobs.values()):
+            return jsonify({'error': 'jobs must map job IDs to job objects'}), 400
+        
+        # Only these jobs are embedded; readers switch to the new catalog atomically
+        return apply_catalog_changes(jobs)
+    
+    except Exception as e:
+        logger.exception("Error in upsert_jobs")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/admin/jobs', methods=['DELETE'])
+def delete_jobs():
+    error = admin_error()
+    if error:
+        return error
+    try:
+        data = request.get_json()
+        job_ids = data.get('job_ids', [])
+        if not isinstance(job_ids, list) or not all(isinstance(job_id, str) for job_id in job_ids):
+            return jsonify({'error': 'job_ids must be a list of strings'}), 400
+        
+        return apply_catalog_changes(dict.fromkeys(job_ids))
+    
+    except Exception as e:
+        logger.exception("Error in delete_jobs")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/admin/catalog', methods=['GET'])
+def get_catalog():
+    error = admin_error()
+    if error:
+        return error
+    return jsonify({'success': True, **catalog_info()})
+
+@app.route('/session/<session_id>', methods=['GET'])
+def get_session(session_id):
+    if result_cache is None:
+        return jsonify({'error': 'Sessions are disabled'}), 404
+    session = result_cache.get_session(valid_session_id(session_id))
+    if session is None:
+        return jsonify({'error': 'Session not found'}), 404
+    return jsonify({'success': True, **session})
+
+@app.route('/ready', methods=['GET'])
+def ready():
+    if warm_up_seconds is None:
+        return jsonify({'ready': False}), 503
+    return jsonify({
+        'ready': True,
+        'warm_up_seconds': warm_up_seconds,
+        'pid': os.getpid()
+    })
+
+@app.route('/stats', methods=['GET'])
+def get_stats():
+    return jsonify({
+        'success': True,
+        'embedding_cache': job_matcher.embedding_cache.stats(),
+        'encoder': job_matcher.encoder.stats() if job_matcher.encoder else None,
+        'result_cache': result_cache.stats() if result_cache else None
+    })
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    # Counters and histograms of this worker process in Prometheus text format
+    return Response(metrics.REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ['pdf', 'docx']
 
 
 
 if __name__ == '__main__':
-    print("Starting Flask server...")
+    warm_up()
+    logger.info("Starting Flask server...")
     try:
         app.run(debug=True, host='127.0.0.1', port=5001)
     except Exception as e:
-        print(f"Error starting server: {e}")
\ No newline at end of file
+        logger.error("Error starting server: %s", e)
\ No newline at end of file
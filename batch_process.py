@@ -0,0 +1,244 @@
+"""Bulk resume processing: extract skills from many resumes into JSONL.
+
+PDF/DOCX parsing is CPU-bound, so resumes are fanned out across a process
+pool. One JSON record per resume is appended to the output as soon as it
+finishes. Re-running with the same output file skips resumes that already
+have a successful record, so an interrupted run picks up where it stopped
+and failed resumes are retried. If a worker process dies, the resumes it
+had queued are retried one at a time on their own pool, so only the one
+that crashes it gets an error record. At most --max-in-flight resumes are
+queued at once, so memory stays bounded for any corpus size.
+
+    python batch_process.py resumes/ --output skills.jsonl --workers 8
+    python batch_process.py --manifest paths.txt --output skills.jsonl --match-output matches.jsonl
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterator, List, Optional
+
+from resume_processor import ResumeProcessor
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.docx')
+
+# One ResumeProcessor per worker process, built by _init_worker
+_processor = None
+
+def _init_worker(max_pages: int, max_chars: int):
+    global _processor
+    _processor = ResumeProcessor(max_pages=max_pages, max_chars=max_chars)
+
+def process_resume(path: str) -> Dict:
+    """Extract text and skills from one resume; errors are recorded, not raised."""
+    record = {'path': path}
+    start = time.perf_counter()
+    try:
+        extraction = _processor.extract_text_with_stats(path)
+        extracted = time.perf_counter()
+        skills = _processor.extract_skills(extraction['text'])
+        record.update({
+            'skills': skills,
+            'pages': extraction['pages'],
+            'chars': len(extraction['text']),
+            'truncated': extraction['truncated'],
+            'extract_ms': (extracted - start) * 1000,
+            'skills_ms': (time.perf_counter() - extracted) * 1000
+        })
+    except Exception as e:
+        record['error'] = str(e)
+    record['total_ms'] = (time.perf_counter() - start) * 1000
+    return record
+
+def iter_resume_paths(directory: Optional[str] = None, manifest: Optional[str] = None) -> Iterator[str]:
+    """Yield resume paths from a directory tree or a manifest with one path per line."""
+    if manifest:
+        with open(manifest) as f:
+            for line in f:
+                path = line.strip()
+                if path:
+                    yield path
+        return
+
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for filename in sorted(files):
+            if os.path.splitext(filename)[1].lower() in SUPPORTED_EXTENSIONS:
+                yield os.path.join(root, filename)
+
+def iter_records(path: str) -> Iterator[Dict]:
+    """Yield the JSON records in a JSONL file, skipping a partially written last line."""
+    if not os.path.exists(path):
+        return
+    with open(path) as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+def open_for_append(path: str):
+    """Open a JSONL file for appending, dropping a partial line left by an interrupted run."""
+    if os.path.exists(path):
+        with open(path, 'rb+') as f:
+            end = f.seek(0, os.SEEK_END)
+            position = end
+            # Scan backwards for the last newline without reading the whole file
+            while position > 0:
+                block_start = max(0, position - 65536)
+                f.seek(block_start)
+                block = f.read(position - block_start)
+                newline = block.rfind(b'\n')
+                if newline != -1:
+                    position = block_start + newline + 1
+                    break
+                position = block_start
+            if position != end:
+                f.truncate(position)
+    return open(path, 'a')
+
+def write_record(out, record: Dict):
+    out.write(json.dumps(record) + '\n')
+    out.flush()
+
+def run_extraction(paths: Iterator[str], output_path: str, workers: Optional[int] = None,
+                   max_in_flight: Optional[int] = None, max_pages: int = 50, max_chars: int = 200000) -> Dict:
+    """Process resumes across a process pool, streaming records to output_path."""
+    # Failed resumes are retried on the next run; their earlier error records stay in the file
+    completed = {record['path'] for record in iter_records(output_path) if 'error' not in record}
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or workers * 4
+    counts = {'processed': 0, 'errors': 0, 'skipped': 0}
+
+    def new_pool(n_workers: int) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(n_workers, initializer=_init_worker, initargs=(max_pages, max_chars))
+
+    def save(record: Dict):
+        write_record(out, record)
+        counts['processed'] += 1
+        if 'error' in record:
+            counts['errors'] += 1
+
+    def collect(futures) -> List[str]:
+        """Write a record per finished future; returns the paths lost to a dead worker."""
+        lost = []
+        for future in futures:
+            path = in_flight.pop(future)
+            try:
+                record = future.result()
+            except BrokenProcessPool:
+                lost.append(path)
+                continue
+            save(record)
+        return lost
+
+    def recover(lost: List[str]):
+        """Retry every resume queued on a broken pool one at a time, then start a new pool.
+
+        A dead worker fails all pending futures, so only a resume that kills
+        a one-worker pool on its own gets an error record.
+        """
+        nonlocal pool
+        lost = lost + collect(wait(in_flight).done)
+        pool.shutdown()
+        single = new_pool(1)
+        for path in lost:
+            try:
+                record = single.submit(process_resume, path).result()
+            except BrokenProcessPool as e:
+                record = {'path': path, 'error': f"Worker process died: {e}"}
+                single.shutdown()
+                single = new_pool(1)
+            save(record)
+        single.shutdown()
+        pool = new_pool(workers)
+
+    # future -> resume path
+    in_flight = {}
+    with open_for_append(output_path) as out:
+        pool = new_pool(workers)
+        try:
+            for path in paths:
+                if path in completed:
+                    counts['skipped'] += 1
+                    continue
+                if len(in_flight) >= max_in_flight:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    lost = collect(done)
+                    if lost:
+                        recover(lost)
+                try:
+                    future = pool.submit(process_resume, path)
+                except BrokenProcessPool:
+                    recover([])
+                    future = pool.submit(process_resume, path)
+                in_flight[future] = path
+            lost = collect(wait(in_flight).done)
+            if lost:
+                recover(lost)
+        finally:
+            pool.shutdown()
+
+    return counts
+
+def run_matching(skills_path: str, output_path: str, batch_size: int = 256, top_k: int = 5,
+                 store_dir: Optional[str] = 'embedding_store') -> Dict:
+    """Match every extracted skill set against the catalog, encoding in batches."""
+    # Imported here so extraction-only runs never load the embedding model
+    from job_matcher import JobMatcher
+
+    completed = {record['path'] for record in iter_records(output_path)}
+    job_matcher = JobMatcher(store_dir=store_dir)
+    counts = {'matched': 0, 'skipped': 0}
+
+    def flush(batch: List[Dict]):
+        results = job_matcher.find_matches_batch([{'skills': record['skills']} for record in batch], top_k)
+        for record, job_matches in zip(batch, results):
+            write_record(out, {'path': record['path'], 'job_matches': job_matches})
+        counts['matched'] += len(batch)
+
+    with open_for_append(output_path) as out:
+        batch = []
+        for record in iter_records(skills_path):
+            if 'error' in record or not record['skills'] or record['path'] in completed:
+                counts['skipped'] += 1
+                continue
+            batch.append(record)
+            if len(batch) >= batch_size:
+                flush(batch)
+                batch = []
+        if batch:
+            flush(batch)
+
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract skills from resumes in bulk.")
+    parser.add_argument('directory', nargs='?', help="Directory to scan for PDF/DOCX resumes")
+    parser.add_argument('--manifest', help="File listing one resume path per line")
+    parser.add_argument('--output', required=True, help="JSONL file for extracted skills")
+    parser.add_argument('--workers', type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument('--max-in-flight', type=int, help="Resumes queued at once (default: 4 per worker)")
+    parser.add_argument('--max-pages', type=int, default=50)
+    parser.add_argument('--max-chars', type=int, default=200000)
+    parser.add_argument('--match-output', help="Also match extracted skills to jobs into this JSONL file")
+    parser.add_argument('--match-batch-size', type=int, default=256)
+    args = parser.parse_args()
+
+    if not args.directory and not args.manifest:
+        parser.error("give a directory or --manifest")
+
+    start = time.perf_counter()
+    paths = iter_resume_paths(args.directory, args.manifest)
+    counts = run_extraction(paths, args.output, args.workers, args.max_in_flight, args.max_pages, args.max_chars)
+    print(f"Extraction: {counts} in {time.perf_counter() - start:.1f}s")
+
+    if args.match_output:
+        start = time.perf_counter()
+        counts = run_matching(args.output, args.match_output, args.match_batch_size)
+        print(f"Matching: {counts} in {time.perf_counter() - start:.1f}s")
+
+if __name__ == '__main__':
+    main()
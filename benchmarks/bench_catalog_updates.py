@@ -0,0 +1,95 @@
+"""Live catalog update throughput, and find_matches latency while updates run.
+
+    python benchmarks/bench_catalog_updates.py [n_jobs] [--index]
+
+Times JobMatcher.update_catalog for batches of 1, 10 and 100 upserted jobs,
+then measures find_matches p50/p99 on an idle catalog and again while a
+background thread publishes a 10-job update every 100 ms. --index serves
+through the IVF index. Uses the offline stub encoder, so the numbers
+exclude model time for the changed jobs.
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+import numpy as np
+from job_matcher import JobMatcher
+from synthetic import StubEncoder, make_catalog, make_profiles
+
+def query_latencies(matcher: JobMatcher, profiles, iterations: int):
+    latencies = []
+    for i in range(iterations):
+        profile = profiles[i % len(profiles)]
+        start = time.perf_counter()
+        matcher.find_matches(profile['skills'], profile['job_preference'])
+        latencies.append((time.perf_counter() - start) * 1000)
+    return np.percentile(latencies, [50, 99])
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    n_jobs = int(args[0]) if args else 20000
+    catalog = make_catalog(n_jobs)
+    # Replacement jobs; distinct seed so every upsert changes the job
+    updates = list(make_catalog(n_jobs, seed=1).values())
+    job_ids = list(catalog)
+
+    start = time.perf_counter()
+    matcher = JobMatcher(model=StubEncoder(), onet_data=catalog)
+    if '--index' in sys.argv:
+        matcher.load_index(tempfile.mkdtemp())
+    print(f"initial build: {time.perf_counter() - start:.2f} s for {n_jobs} jobs")
+    # Keep measurements about appends; compaction is timed separately below
+    matcher.compaction_fraction = 1.0
+
+    position = 0
+    def next_changes(batch_size: int):
+        nonlocal position
+        changes = {}
+        for _ in range(batch_size):
+            changes[job_ids[position % n_jobs]] = updates[position % n_jobs]
+            position += 1
+        return changes
+
+    for batch_size in (1, 10, 100):
+        timings = []
+        for _ in range(20):
+            changes = next_changes(batch_size)
+            start = time.perf_counter()
+            matcher.update_catalog(changes)
+            timings.append((time.perf_counter() - start) * 1000)
+        p50 = np.percentile(timings, 50)
+        print(f"update batch {batch_size:>3}: p50 {p50:.1f} ms, {batch_size / p50 * 1000:.0f} jobs/s")
+
+    profiles = make_profiles(catalog, 200)
+    matcher.find_matches(profiles[0]['skills'])
+    p50, p99 = query_latencies(matcher, profiles, 300)
+    print(f"find_matches idle: p50 {p50:.2f} ms, p99 {p99:.2f} ms")
+
+    stop = threading.Event()
+    published = [0]
+    def updater():
+        while not stop.is_set():
+            matcher.update_catalog(next_changes(10))
+            published[0] += 1
+            time.sleep(0.1)
+    thread = threading.Thread(target=updater)
+    thread.start()
+    p50, p99 = query_latencies(matcher, profiles, 300)
+    stop.set()
+    thread.join()
+    print(f"find_matches during updates: p50 {p50:.2f} ms, p99 {p99:.2f} ms ({published[0]} updates published)")
+
+    snapshot = matcher.snapshot
+    start = time.perf_counter()
+    matcher.compact(snapshot)
+    print(f"compaction: {(time.perf_counter() - start) * 1000:.0f} ms "
+          f"({len(snapshot.job_ids) - snapshot.n_live} retired of {len(snapshot.job_ids)} rows)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""Per-resume skill extraction latency as the skill vocabulary grows.
+
+Compares the single-pass SkillMatcher against the previous approach of one
+\\b...\\b regex search per vocabulary entry.
+
+    python benchmarks/bench_skill_matcher.py
+"""
+import os
+import random
+import re
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from resume_processor import ResumeProcessor
+from skill_matcher import SkillMatcher
+
+def regex_per_skill(skills, text):
+    """The previous extract_skills matching loop, kept as the baseline."""
+    text_lower = text.lower()
+    found = set()
+    for skill in skills:
+        if re.search(r'\b' + re.escape(skill.lower()) + r'\b', text_lower):
+            found.add(skill)
+    return found
+
+def synthetic_vocabulary(base, size, rng):
+    """Pad the real vocabulary with random one- and two-word skills."""
+    vocabulary = set(base)
+    while len(vocabulary) < size:
+        words = [''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 9)))
+                 for _ in range(rng.randint(1, 2))]
+        vocabulary.add(' '.join(words))
+    return sorted(vocabulary)
+
+def synthetic_resume(vocabulary, rng, n_words=800):
+    words = []
+    for _ in range(n_words):
+        words.append(rng.choice(vocabulary) if rng.random() < 0.1 else rng.choice(['and', 'with', 'team', 'built', 'led', 'the']))
+    return ', '.join(words)
+
+def time_per_call(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+def main():
+    rng = random.Random(0)
+    base = sorted(ResumeProcessor().all_skills)
+    print(f"{'vocabulary':>10} {'build ms':>9} {'matcher ms':>11} {'regex ms':>9}")
+    for size in (len(base), 3000, 30000):
+        vocabulary = synthetic_vocabulary(base, size, rng)
+        text = synthetic_resume(vocabulary, rng)
+
+        start = time.perf_counter()
+        matcher = SkillMatcher({'all': vocabulary})
+        build_ms = (time.perf_counter() - start) * 1000
+
+        assert matcher.find_skills(text) == regex_per_skill(vocabulary, text)
+        matcher_ms = time_per_call(lambda: matcher.find_skills(text), 20)
+        regex_ms = time_per_call(lambda: regex_per_skill(vocabulary, text), 1 if size > 5000 else 5)
+        print(f"{size:>10} {build_ms:>9.1f} {matcher_ms:>11.2f} {regex_ms:>9.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""Autocomplete latency of SkillSuggestionIndex on a large synthetic vocabulary.
+
+    python benchmarks/bench_suggestions.py [n_skills]
+"""
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from skill_suggester import SkillSuggestionIndex
+
+def main():
+    n_skills = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    rng = random.Random(0)
+    counts = {}
+    while len(counts) < n_skills:
+        words = [''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(2, 10)))
+                 for _ in range(rng.randint(1, 3))]
+        counts[' '.join(words).title()] = rng.randint(1, 1000)
+
+    start = time.perf_counter()
+    index = SkillSuggestionIndex(counts)
+    print(f"build: {(time.perf_counter() - start) * 1000:.0f} ms for {n_skills} skills")
+
+    # Keystroke-style queries: growing prefixes and infixes of real skills
+    skills = list(counts)
+    queries = []
+    for _ in range(2000):
+        name = rng.choice(skills).lower()
+        offset = rng.randint(0, max(0, len(name) - 1)) if rng.random() < 0.5 else 0
+        queries.append(name[offset:offset + rng.randint(1, 8)])
+    queries += [''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(1, 4))) for _ in range(500)]
+
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        index.suggest(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    print(f"suggest: p50 {p50:.3f} ms, p95 {p95:.3f} ms, p99 {p99:.3f} ms, max {max(latencies):.3f} ms")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,207 @@
+"""End-to-end benchmarks of the matching and resume hot paths, with regression checks.
+
+Runs offline and deterministically against synthetic catalogs and resumes
+(benchmarks/synthetic.py) with a stub encoder instead of the real model.
+Each catalog size runs in a fresh process so peak RSS is per size. Per
+operation it records p50/p95/p99 latency, peak Python allocation of one
+call (tracemalloc) and model calls per request, and writes everything to
+a JSON file.
+
+    python benchmarks/run_benchmarks.py --output results.json
+    python benchmarks/run_benchmarks.py --sizes 5,1000 --compare baseline.json
+
+--compare exits non-zero when a metric regresses past the limits in
+benchmarks/thresholds.json.
+"""
+import argparse
+import io
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT)
+sys.path.insert(0, BENCH_DIR)
+
+import numpy as np
+from synthetic import StubEncoder, make_catalog, make_profiles, make_resume
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def measure(fn: Callable[[int], object], iterations: int, encoder: Optional[StubEncoder] = None) -> Dict:
+    """Latency percentiles of fn(i) over iterations calls, plus one traced call for peak allocation."""
+    calls_before = encoder.calls if encoder else 0
+    latencies = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        fn(i)
+        latencies.append((time.perf_counter() - start) * 1000)
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    result = {'iterations': iterations, 'p50_ms': p50, 'p95_ms': p95, 'p99_ms': p99}
+    if encoder:
+        result['encode_calls_per_request'] = (encoder.calls - calls_before) / iterations
+
+    tracemalloc.start()
+    fn(iterations)
+    result['peak_alloc_kb'] = tracemalloc.get_traced_memory()[1] / 1024
+    tracemalloc.stop()
+    return result
+
+def bench_catalog(n_jobs: int, iterations: int) -> Dict:
+    """Startup and per-request benchmarks of JobMatcher on an n_jobs catalog."""
+    from job_matcher import JobMatcher
+
+    catalog = make_catalog(n_jobs)
+    encoder = StubEncoder()
+    rss_before = peak_rss_mb()
+    start = time.perf_counter()
+    matcher = JobMatcher(model=encoder, onet_data=catalog)
+    results = {
+        'jobs': n_jobs,
+        'startup': {
+            'seconds': time.perf_counter() - start,
+            'encode_calls': encoder.calls,
+            'peak_rss_mb': peak_rss_mb(),
+            'rss_growth_mb': peak_rss_mb() - rss_before
+        }
+    }
+
+    start = time.perf_counter()
+    matcher.precompute_job_embeddings()
+    results['precompute_job_embeddings'] = {'seconds': time.perf_counter() - start}
+
+    # Distinct profiles, so every request misses the embedding cache
+    profiles = make_profiles(catalog, iterations + 1, seed=1)
+    results['find_matches'] = measure(
+        lambda i: matcher.find_matches(profiles[i]['skills'], profiles[i]['job_preference']), iterations, encoder)
+    # The same profile again, served from the embedding cache
+    results['find_matches_repeat'] = measure(
+        lambda i: matcher.find_matches(profiles[0]['skills'], profiles[0]['job_preference']), iterations, encoder)
+
+    job_ids = matcher.job_ids
+    gap_profiles = make_profiles(catalog, iterations + 1, seed=2)
+    results['analyze_skill_gap'] = measure(
+        lambda i: matcher.analyze_skill_gap(job_ids[(i * 7919) % len(job_ids)], gap_profiles[i]['skills']),
+        iterations, encoder)
+    results['catalog_skill_gap'] = measure(
+        lambda i: matcher.catalog_skill_gap(gap_profiles[i]['skills']), iterations, encoder)
+
+    skills = matcher.suggestion_index.skills
+    queries = [skills[(i * 31) % len(skills)].lower()[:1 + i % 5] for i in range(iterations + 1)]
+    results['get_skill_suggestions'] = measure(lambda i: matcher.get_skill_suggestions(queries[i]), iterations)
+
+    results['peak_rss_mb'] = peak_rss_mb()
+    return results
+
+def bench_resumes(iterations: int, page_counts: List[int]) -> Dict:
+    """extract_text and extract_skills latency on synthetic PDF and DOCX resumes."""
+    from resume_processor import ResumeProcessor
+
+    processor = ResumeProcessor()
+    results = {}
+    for file_type in ('pdf', 'docx'):
+        for pages in page_counts:
+            data = make_resume(file_type, pages, seed=pages)
+            text = processor.extract_text(io.BytesIO(data), file_type)
+            results[f'{file_type}_{pages}p'] = {
+                'bytes': len(data),
+                'chars': len(text),
+                'extract_text': measure(lambda i: processor.extract_text(io.BytesIO(data), file_type), iterations),
+                'extract_skills': measure(lambda i: processor.extract_skills(text), iterations)
+            }
+    results['peak_rss_mb'] = peak_rss_mb()
+    return results
+
+def run_isolated(fn: Callable, *args) -> Dict:
+    """Run fn in a fresh process so its peak RSS is not inflated by earlier runs."""
+    with multiprocessing.get_context('spawn').Pool(1) as pool:
+        return pool.apply(fn, args)
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+def flatten(results: Dict, prefix: str = '') -> Dict[str, float]:
+    """Numeric leaves of a results tree keyed by dotted path."""
+    flat = {}
+    for key, value in results.items():
+        path = f'{prefix}{key}'
+        if isinstance(value, dict):
+            flat.update(flatten(value, path + '.'))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[path] = value
+    return flat
+
+def compare(baseline: Dict, current: Dict, thresholds: Dict) -> List[str]:
+    """Describe every metric that grew past its relative limit and absolute noise floor."""
+    base, now = flatten(baseline['results']), flatten(current['results'])
+    regressions = []
+    for path, value in now.items():
+        metric = path.rsplit('.', 1)[-1]
+        if metric not in thresholds['relative'] or path not in base:
+            continue
+        limit = base[path] * (1 + thresholds['relative'][metric])
+        if value > limit and value - base[path] > thresholds['min_absolute'].get(metric, 0):
+            regressions.append(f"{path}: {base[path]:.3f} -> {value:.3f} (limit {limit:.3f})")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--sizes', default='5,1000,100000', help="Comma-separated catalog sizes")
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--resume-pages', default='1,5,20', help="Comma-separated resume lengths in pages")
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--compare', help="Baseline results file to check for regressions")
+    parser.add_argument('--thresholds', default=os.path.join(BENCH_DIR, 'thresholds.json'))
+    args = parser.parse_args()
+
+    results = {}
+    for n_jobs in (int(size) for size in args.sizes.split(',')):
+        start = time.perf_counter()
+        results[f'catalog_{n_jobs}'] = run_isolated(bench_catalog, n_jobs, args.iterations)
+        print(f"catalog_{n_jobs}: done in {time.perf_counter() - start:.1f}s")
+    page_counts = [int(pages) for pages in args.resume_pages.split(',')]
+    results['resumes'] = run_isolated(bench_resumes, args.iterations, page_counts)
+    print("resumes: done")
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': int(time.time()),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'iterations': args.iterations
+        },
+        'results': results
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        with open(args.thresholds) as f:
+            thresholds = json.load(f)
+        regressions = compare(baseline, report, thresholds)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions against {args.compare} (commit {baseline['meta'].get('commit', '?')})")
+
+if __name__ == '__main__':
+    main()
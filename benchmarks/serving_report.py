@@ -0,0 +1,103 @@
+"""Time-to-first-request and per-process memory of the backend (Linux only).
+
+Starts the backend, waits until a /match_jobs request succeeds, then reads
+Rss and Pss for the server process and its workers from
+/proc/<pid>/smaps_rollup. Pss divides shared pages between the processes
+that share them, so the sum of Pss is the real footprint of a pre-forked
+deployment.
+
+    python benchmarks/serving_report.py --mode dev       # python app.py
+    python benchmarks/serving_report.py --mode prefork   # gunicorn -c gunicorn.conf.py app:app
+"""
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def memory_kb(pid: int) -> dict:
+    """Rss and Pss of a process in kB."""
+    values = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            key, _, rest = line.partition(':')
+            if key in ('Rss', 'Pss'):
+                values[key.lower() + '_kb'] = int(rest.split()[0])
+    return values
+
+def descendants(pid: int) -> list:
+    """All descendant PIDs of pid, found by scanning /proc."""
+    parents = {}
+    for entry in os.listdir('/proc'):
+        if entry.isdigit():
+            try:
+                with open(f'/proc/{entry}/stat') as f:
+                    parents[int(entry)] = int(f.read().rsplit(')', 1)[1].split()[1])
+            except (OSError, IndexError):
+                continue
+    found, frontier = [], [pid]
+    while frontier:
+        parent = frontier.pop()
+        children = [child for child, ppid in parents.items() if ppid == parent]
+        found.extend(children)
+        frontier.extend(children)
+    return found
+
+def post_json(url: str, payload: dict) -> int:
+    request = urllib.request.Request(url, json.dumps(payload).encode(), {'Content-Type': 'application/json'})
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return response.status
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--mode', choices=['dev', 'prefork'], default='prefork')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--port', type=int, default=5001)
+    parser.add_argument('--timeout', type=float, default=600)
+    args = parser.parse_args()
+
+    base_url = f'http://127.0.0.1:{args.port}'
+    env = dict(os.environ, WEB_CONCURRENCY=str(args.workers), BIND=f'127.0.0.1:{args.port}')
+    if args.mode == 'dev':
+        command = [sys.executable, 'app.py']
+    else:
+        command = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'app:app']
+
+    start = time.perf_counter()
+    server = subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while True:
+            if server.poll() is not None:
+                sys.exit(f"server exited with code {server.returncode}")
+            if time.perf_counter() - start > args.timeout:
+                sys.exit("server did not answer in time")
+            try:
+                post_json(base_url + '/match_jobs', {'skills': ['Python', 'SQL']})
+                break
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.2)
+        time_to_first_request = time.perf_counter() - start
+        # Let the remaining workers finish booting before measuring them
+        time.sleep(2)
+
+        processes = [server.pid] + descendants(server.pid)
+        report = {
+            'mode': args.mode,
+            'time_to_first_request_s': round(time_to_first_request, 2),
+            'processes': {pid: memory_kb(pid) for pid in processes}
+        }
+        report['total_rss_mb'] = round(sum(p['rss_kb'] for p in report['processes'].values()) / 1024, 1)
+        report['total_pss_mb'] = round(sum(p['pss_kb'] for p in report['processes'].values()) / 1024, 1)
+        print(json.dumps(report, indent=2))
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=30)
+
+if __name__ == '__main__':
+    main()
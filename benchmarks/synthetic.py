@@ -0,0 +1,159 @@
+"""Deterministic synthetic inputs for the benchmarks: a stub encoder, O*NET-shaped
+catalogs and PDF/DOCX resumes.
+"""
+import io
+import itertools
+import random
+import zlib
+from typing import Dict, List
+import numpy as np
+
+# Real skill names so resume extraction and autocomplete see realistic input
+BASE_SKILLS = [
+    'Python', 'Java', 'JavaScript', 'TypeScript', 'SQL', 'React', 'Node.js', 'Docker', 'Kubernetes', 'AWS',
+    'Azure', 'Git', 'Machine Learning', 'Deep Learning', 'TensorFlow', 'PyTorch', 'Pandas', 'NumPy',
+    'Excel', 'Tableau', 'Power BI', 'Statistics', 'Financial Modeling', 'Project Management',
+    'Agile', 'Scrum', 'Communication', 'Leadership', 'Problem Solving', 'Critical Thinking',
+    'Digital Marketing', 'SEO', 'Salesforce', 'Verilog', 'PCB Design', 'Embedded Systems'
+]
+CATEGORY_SIZES = {
+    'skills': 10,
+    'abilities': 5,
+    'knowledge': 5,
+    'work_activities': 4,
+    'tools_used': 4,
+    'technology_skills': 7
+}
+WORDS = ['data', 'systems', 'design', 'analysis', 'cloud', 'network', 'quality', 'research', 'clinical',
+         'supply', 'chain', 'risk', 'audit', 'security', 'mobile', 'web', 'process', 'customer', 'field',
+         'control', 'signal', 'energy', 'software', 'hardware', 'operations', 'planning', 'modeling']
+
+class StubEncoder:
+    """Small deterministic stand-in for SentenceTransformer.
+
+    Each word hashes (crc32) into a fixed random table; a text's embedding is
+    the sum of its words' rows. Similar texts get similar vectors, results are
+    identical across runs, and calls/texts are counted per encode.
+    """
+    model_name = 'stub-hashing-encoder'
+
+    def __init__(self, dim: int = 64, buckets: int = 4096, seed: int = 0):
+        self.dim = dim
+        self.buckets = buckets
+        self.table = np.random.default_rng(seed).standard_normal((buckets, dim)).astype(np.float32)
+        self.calls = 0
+        self.texts = 0
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dim
+
+    def encode(self, texts: List[str], batch_size: int = 32, **kwargs) -> np.ndarray:
+        self.calls += 1
+        self.texts += len(texts)
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            buckets = [zlib.crc32(word.encode('utf-8')) % self.buckets for word in text.lower().split()]
+            if buckets:
+                out[i] = self.table[buckets].sum(axis=0)
+        return out
+
+def make_vocabulary(n_skills: int, seed: int = 0) -> List[str]:
+    """BASE_SKILLS plus up to n_skills generated two- and three-word skill names."""
+    generated = [' '.join(words).title() for size in (2, 3) for words in itertools.product(WORDS, repeat=size)]
+    random.Random(seed).shuffle(generated)
+    return BASE_SKILLS + generated[:max(0, n_skills - len(BASE_SKILLS))]
+
+def make_catalog(n_jobs: int, seed: int = 0) -> Dict[str, Dict]:
+    """An O*NET-shaped catalog of n_jobs jobs with Zipf-like skill popularity."""
+    rng = np.random.default_rng(seed)
+    vocabulary = make_vocabulary(max(200, min(20000, n_jobs // 5)), seed)
+    # Popular skills are drawn far more often, as in the real catalog
+    weights = 1.0 / np.arange(1, len(vocabulary) + 1)
+    sizes = list(CATEGORY_SIZES.values())
+    # All random draws up front; the per-job loop only slices them
+    skills = rng.choice(len(vocabulary), size=(n_jobs, sum(sizes)), p=weights / weights.sum()).tolist()
+    words = rng.integers(len(WORDS), size=(n_jobs, 36)).tolist()
+    lengths = rng.integers(12, 31, size=n_jobs).tolist()
+    ratings = np.round(rng.uniform(3, 5, size=(n_jobs, 4)), 1).tolist()
+    offsets = list(itertools.accumulate([0] + sizes))
+
+    catalog = {}
+    for i in range(n_jobs):
+        row = words[i]
+        job = {
+            'title': f"{WORDS[row[0]].title()} {WORDS[row[1]].title()} Specialist {i}",
+            'description': ' '.join(WORDS[w] for w in row[6:6 + lengths[i]]).capitalize() + '.'
+        }
+        for category, start, end in zip(CATEGORY_SIZES, offsets, offsets[1:]):
+            job[category] = list(dict.fromkeys(vocabulary[s] for s in skills[i][start:end]))
+        job['task_ratings'] = {WORDS[w].title(): rating for w, rating in zip(row[2:6], ratings[i])}
+        catalog[f"{10 + i // 10000:02d}-{i % 10000:04d}.00"] = job
+    return catalog
+
+def make_profiles(catalog: Dict[str, Dict], n_profiles: int, seed: int = 0) -> List[Dict]:
+    """User profiles built from catalog skills, some with a job preference."""
+    rng = random.Random(seed)
+    pool = sorted({skill for job in catalog.values() for skill in job['skills'] + job['technology_skills']})
+    return [{
+        'skills': rng.sample(pool, min(len(pool), rng.randint(3, 15))),
+        'job_preference': rng.choice(['', '', 'remote data role', 'software engineering'])
+    } for _ in range(n_profiles)]
+
+def make_resume_lines(n_lines: int, seed: int = 0) -> List[str]:
+    """Resume-like lines mixing prose, skill lists and bullet points."""
+    rng = random.Random(seed)
+    lines = []
+    for i in range(n_lines):
+        kind = i % 4
+        if kind == 0:
+            lines.append('Skills: ' + ', '.join(rng.sample(BASE_SKILLS, 6)))
+        elif kind == 1:
+            lines.append(f"- Built {rng.choice(WORDS)} {rng.choice(WORDS)} tools with {rng.choice(BASE_SKILLS)} and {rng.choice(BASE_SKILLS)}")
+        else:
+            lines.append(' '.join(rng.choice(WORDS) for _ in range(rng.randint(8, 14))).capitalize())
+    return lines
+
+def make_pdf(pages: List[List[str]]) -> bytes:
+    """A minimal valid PDF with one Helvetica text page per list of lines."""
+    n_pages = len(pages)
+    font_id = 3 + 2 * n_pages
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        f"<< /Type /Pages /Kids [{' '.join(f'{3 + 2 * i} 0 R' for i in range(n_pages))}] /Count {n_pages} >>".encode()
+    ]
+    for i, lines in enumerate(pages):
+        objects.append(f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {4 + 2 * i} 0 R '
+                       f'/Resources << /Font << /F1 {font_id} 0 R >> >> >>'.encode())
+        escaped = (line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)') for line in lines)
+        stream = f"BT /F1 10 Tf 12 TL 50 750 Td {' '.join(f'({line}) Tj T*' for line in escaped)} ET".encode('latin-1')
+        objects.append(b'<< /Length %d >>\nstream\n' % len(stream) + stream + b'\nendstream')
+    objects.append(b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>')
+
+    out = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for i, body in enumerate(objects):
+        offsets.append(len(out))
+        out += b'%d 0 obj\n' % (i + 1) + body + b'\nendobj\n'
+    xref = len(out)
+    out += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    for offset in offsets:
+        out += b'%010d 00000 n \n' % offset
+    out += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+    return bytes(out)
+
+def make_docx(lines: List[str]) -> bytes:
+    """A DOCX with one paragraph per line."""
+    from docx import Document
+    document = Document()
+    for line in lines:
+        document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+def make_resume(file_type: str, n_pages: int, seed: int = 0, lines_per_page: int = 50) -> bytes:
+    """A synthetic resume of about n_pages pages as PDF or DOCX bytes."""
+    lines = make_resume_lines(n_pages * lines_per_page, seed)
+    if file_type == 'pdf':
+        return make_pdf([lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)])
+    return make_docx(lines)
@@ -0,0 +1,108 @@
+"""Immutable catalog snapshots for serving reads while the catalog is updated.
+
+A CatalogSnapshot bundles everything derived from one catalog version. The
+writer never mutates a published snapshot: it builds the next one and swaps
+JobMatcher.snapshot in a single assignment. Readers take self.snapshot once
+per request and use only that object, so they need no lock.
+
+Updates are copy-on-write without copying the matrices. An upserted job is
+appended as a new row and its old row is retired in the `live` mask.
+Deleted rows are only retired. RowBuffer appends into spare capacity past
+the rows that older snapshots can see, so those snapshots keep valid views.
+The job_id mappings are layered CatalogOverlays rather than copied dicts.
+"""
+import math
+import numpy as np
+from typing import Dict, Iterator, Mapping, NamedTuple, Optional, Union
+from ann_index import IVFIndex
+from skill_index import SkillIndex
+from skill_suggester import SkillSuggestionIndex, SkillSuggestionOverlay
+
+class CatalogSnapshot(NamedTuple):
+    version: int
+    # Hash identifying the catalog contents (keys the result cache)
+    catalog_version: str
+    onet_data: Mapping[str, Dict]
+    # Row -> job_id (object array) for every matrix row, including retired rows
+    job_ids: np.ndarray
+    # job_id -> its live row
+    job_index: Mapping[str, int]
+    live: np.ndarray
+    job_embeddings: np.ndarray
+    category_embeddings: Dict[str, np.ndarray]
+    suggestion_index: Union[SkillSuggestionIndex, SkillSuggestionOverlay]
+    skill_index: SkillIndex
+    index: Optional[IVFIndex]
+    # Rows appended since the ANN index was built; searched exactly
+    unindexed_rows: np.ndarray
+
+    @property
+    def n_live(self) -> int:
+        return len(self.job_index)
+
+class CatalogOverlay(Mapping):
+    """Read-only view of a base mapping with upserts and deletions on top.
+
+    Lets an OnetStore-backed catalog take updates without materializing it
+    into a dict, and lets job_index change without copying it. A None in
+    changes marks a deleted key. Iteration follows the live matrix rows:
+    unchanged base keys first, then changed keys in the order of their
+    latest change.
+
+    with_changes keeps at most two layers: the accumulated changes and a
+    small top layer. Only the top layer is copied per update; once it
+    outgrows the square root of the layer below (and min_layer), it is
+    merged down. An update thus copies O(sqrt(changes)) entries amortized.
+    """
+    min_layer = 256
+
+    def __init__(self, base: Mapping[str, Dict], changes: Dict[str, Optional[Dict]]):
+        self.base = base
+        self.changes = changes
+        self._len = len(base) + sum(
+            (job is not None) - (job_id in base) for job_id, job in changes.items()
+        )
+
+    def with_changes(self, changes: Dict[str, Optional[Dict]]) -> 'CatalogOverlay':
+        """A new overlay with changes applied on top; changed keys move to the end of iteration order."""
+        if not isinstance(self.base, CatalogOverlay):
+            return CatalogOverlay(self, dict(changes))
+        top = self._merged(changes)
+        if len(top) <= max(self.min_layer, math.isqrt(len(self.base.changes))):
+            return CatalogOverlay(self.base, top)
+        return CatalogOverlay(self.base.base, self.base._merged(top))
+
+    def _merged(self, changes: Dict[str, Optional[Dict]]) -> Dict[str, Optional[Dict]]:
+        merged = {job_id: job for job_id, job in self.changes.items() if job_id not in changes}
+        merged.update(changes)
+        return merged
+
+    def __getitem__(self, job_id: str) -> Dict:
+        if job_id in self.changes:
+            job = self.changes[job_id]
+            if job is None:
+                raise KeyError(job_id)
+            return job
+        return self.base[job_id]
+
+    def __contains__(self, job_id) -> bool:
+        if job_id in self.changes:
+            return self.changes[job_id] is not None
+        return job_id in self.base
+
+    def __iter__(self) -> Iterator[str]:
+        for job_id in self.base:
+            if job_id not in self.changes:
+                yield job_id
+        for job_id, job in self.changes.items():
+            if job is not None:
+                yield job_id
+
+    def __len__(self) -> int:
+        return self._len
+
+def overlay(base: Mapping, changes: Dict) -> CatalogOverlay:
+    """base with changes applied on top, reusing base's layers if it is already an overlay."""
+    if isinstance(base, CatalogOverlay):
+        return base.with_changes(changes)
+    return CatalogOverlay(base, changes)
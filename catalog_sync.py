@@ -0,0 +1,171 @@
+"""Durable catalog change log in job_matcher.db, replayed by every worker.
+
+Admin updates are appended to a catalog_changes table, then applied to the
+local JobMatcher. Other gunicorn workers pick them up by polling the table
+every JOB_MATCHER_CATALOG_POLL_SECONDS. On startup the master replays the
+log before forking, so a restart serves the updated catalog. Entries
+superseded by a later change to the same job are deleted, so the log holds
+at most one entry per job and a replay costs at most one update per job.
+Every process that has applied the log up to the same entry reports the
+same catalog version, so they share result cache entries.
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+from job_matcher import JobMatcher
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS catalog_changes (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        job_id TEXT NOT NULL,
+        job_data TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE INDEX IF NOT EXISTS catalog_changes_job_id ON catalog_changes (job_id, seq);
+'''
+
+class CatalogChangeLog:
+    """Append-only job upserts and deletions (NULL job_data) in SQLite."""
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._local = threading.local()
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+        conn.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        """This process and thread's connection; SQLite connections must not cross fork()."""
+        if getattr(self._local, 'pid', None) != os.getpid():
+            self._local.conn = sqlite3.connect(self.db_path, timeout=30)
+            self._local.pid = os.getpid()
+        return self._local.conn
+
+    def append(self, changes: Dict[str, Optional[Dict]]) -> int:
+        """Record changes in one transaction; returns the last sequence number."""
+        conn = self._connection()
+        with conn:
+            cursor = None
+            for job_id, job_data in changes.items():
+                cursor = conn.execute(
+                    "INSERT INTO catalog_changes (job_id, job_data) VALUES (?, ?)",
+                    (job_id, None if job_data is None else json.dumps(job_data))
+                )
+        return cursor.lastrowid if cursor else self.last_seq()
+
+    def compact(self) -> int:
+        """Delete entries superseded by a later change to the same job; returns how many.
+
+        Replaying the remaining entries gives the same catalog, and the last
+        entry is always kept, so catalog versions are unchanged. A process
+        that has not applied a deleted entry yet still applies the later one.
+        """
+        conn = self._connection()
+        with conn:
+            cursor = conn.execute(
+                "DELETE FROM catalog_changes WHERE seq NOT IN "
+                "(SELECT MAX(seq) FROM catalog_changes GROUP BY job_id)"
+            )
+        return cursor.rowcount
+
+    def last_seq(self) -> int:
+        row = self._connection().execute("SELECT MAX(seq) FROM catalog_changes").fetchone()
+        return row[0] or 0
+
+    def entries(self, seq: int) -> List[Tuple[int, str, Optional[str]]]:
+        """(seq, job_id, job_data JSON or None) of every entry after seq, in order."""
+        return self._connection().execute(
+            "SELECT seq, job_id, job_data FROM catalog_changes WHERE seq > ? ORDER BY seq", (seq,)
+        ).fetchall()
+
+def coalesce(entries: List[Tuple[int, str, Optional[str]]]) -> Dict[str, Optional[Dict]]:
+    """Changes of entries, reduced to the latest per job."""
+    changes = {}
+    for _, job_id, job_data in entries:
+        # Re-inserting keeps the catalog order of the job's latest change
+        changes.pop(job_id, None)
+        changes[job_id] = None if job_data is None else json.loads(job_data)
+    return changes
+
+class CatalogSync:
+    """Keeps one JobMatcher's catalog in step with the change log."""
+    def __init__(self, job_matcher: JobMatcher, change_log: CatalogChangeLog, poll_seconds: float = 2.0):
+        self.job_matcher = job_matcher
+        self.change_log = change_log
+        self.poll_seconds = poll_seconds
+        # Catalog version before any logged change; later versions derive from it and the seq
+        self.base_version = job_matcher.catalog_version
+        self.applied_seq = 0
+        # Called with the new catalog version after each applied update
+        self.on_update: Optional[Callable[[str], None]] = None
+        self._lock = threading.Lock()
+        # Separate from _lock so starting the poller never waits on a running update
+        self._poller_lock = threading.Lock()
+        self._poller = None
+        self._poller_pid = None
+
+    def publish(self, changes: Dict[str, Optional[Dict]]) -> int:
+        """Log changes for every worker and apply them here; returns the applied sequence number."""
+        # Invalid jobs must never reach the log, where every worker would retry them
+        self.job_matcher.validate_changes(changes)
+        self.change_log.append(changes)
+        self.change_log.compact()
+        return self.sync()
+
+    def sync(self) -> int:
+        """Apply logged changes not yet applied in this process.
+
+        New entries are applied together. If that fails, they are retried one
+        at a time and any entry that still fails is logged and skipped, so a
+        bad entry cannot block later updates, other workers or restarts.
+        Every process skips the same entries, so catalog versions still agree.
+        """
+        with self._lock:
+            entries = self.change_log.entries(self.applied_seq)
+            if not entries:
+                return self.applied_seq
+            try:
+                self._apply(entries)
+            except Exception:
+                logger.exception("Applying catalog changes %d-%d failed; retrying one at a time",
+                                 entries[0][0], entries[-1][0])
+                for entry in entries:
+                    try:
+                        self._apply([entry])
+                    except Exception:
+                        logger.exception("Skipping catalog change %d for job %s", entry[0], entry[1])
+            self.applied_seq = entries[-1][0]
+            if self.on_update:
+                self.on_update(self.job_matcher.catalog_version)
+            return self.applied_seq
+
+    def _apply(self, entries: List[Tuple[int, str, Optional[str]]]):
+        changes = coalesce(entries)
+        self.job_matcher.validate_changes(changes)
+        catalog_version = hashlib.sha1(f"{self.base_version}:{entries[-1][0]}".encode('utf-8')).hexdigest()
+        self.job_matcher.update_catalog(changes, catalog_version)
+
+    def ensure_poller(self):
+        """Start this process's background poller, once per process (workers fork without threads)."""
+        if self._poller_pid == os.getpid() and self._poller.is_alive():
+            return
+        with self._poller_lock:
+            if self._poller_pid != os.getpid() or not self._poller.is_alive():
+                self._poller = threading.Thread(target=self._run, name='catalog-sync', daemon=True)
+                self._poller.start()
+                self._poller_pid = os.getpid()
+
+    def _run(self):
+        while True:
+            time.sleep(self.poll_seconds)
+            try:
+                self.sync()
+            except Exception:
+                logger.exception("Catalog sync failed")
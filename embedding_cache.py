@@ -0,0 +1,67 @@
+import threading
+from collections import OrderedDict
+import numpy as np
+from typing import Dict, List, Optional
+
+def normalize_text(text: str) -> str:
+    """Case- and whitespace-normalize free text."""
+    return ' '.join(text.split()).lower()
+
+def skills_text(skills: List[str]) -> str:
+    """The user's skills as one normalized text, in the order given.
+
+    Only case and whitespace are normalized: the model is order-sensitive,
+    so reordering the skills would change similarity scores.
+    """
+    return normalize_text(' '.join(skills))
+
+class EmbeddingCache:
+    """Thread-safe, size-bounded LRU cache of embeddings keyed by normalized text."""
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Return the cached embedding for key, or None, updating recency and counters."""
+        with self._lock:
+            embedding = self._entries.get(key)
+            if embedding is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return embedding
+
+    def put(self, key: str, embedding: np.ndarray):
+        """Store an embedding, evicting the least recently used entries past maxsize."""
+        if self.maxsize <= 0:
+            return
+        # Cached arrays are shared between requests, so they must not be mutated
+        embedding.setflags(write=False)
+        with self._lock:
+            self._entries[key] = embedding
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        """Snapshot of the cache counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
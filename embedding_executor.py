@@ -0,0 +1,103 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+import numpy as np
+from typing import Dict, List
+from metrics import Histogram, count_encode
+
+class _Request:
+    __slots__ = ('text', 'future', 'enqueued_at')
+
+    def __init__(self, text: str):
+        self.text = text
+        self.future = Future()
+        self.enqueued_at = time.perf_counter()
+
+class BatchingEncoder:
+    """Coalesce encode requests from many threads into batched model calls.
+
+    Callers enqueue texts and wait on futures. A single worker thread takes the
+    oldest request and then keeps collecting until it has max_batch_size texts
+    or that request has waited max_wait_ms. It runs one model.encode call for
+    the batch and resolves every future. The worker starts lazily in whichever
+    process first submits, so it is safe to create before forking.
+    """
+    def __init__(self, model, max_batch_size: int = 32, max_wait_ms: float = 5.0):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+        self._worker_pid = None
+        self.batches = 0
+        self.items = 0
+        self.batch_sizes = Histogram([1, 2, 4, 8, 16, 32, 64, 128])
+        self.wait_ms = Histogram([0.5, 1, 2, 5, 10, 20, 50, 100, 250])
+
+    def _ensure_worker(self):
+        if self._worker_pid == os.getpid() and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker_pid != os.getpid() or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name='embedding-batcher', daemon=True)
+                self._worker.start()
+                self._worker_pid = os.getpid()
+
+    def submit(self, text: str) -> Future:
+        """Queue one text for encoding; the future resolves to its embedding."""
+        self._ensure_worker()
+        request = _Request(text)
+        self._queue.put(request)
+        return request.future
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """Encode texts through the shared batches and wait for the results."""
+        futures = [self.submit(text) for text in texts]
+        return np.vstack([future.result() for future in futures])
+
+    def _collect_batch(self) -> List[_Request]:
+        """Block for the first request, then gather more until full or its deadline passes."""
+        batch = [self._queue.get()]
+        deadline = batch[0].enqueued_at + self.max_wait_ms / 1000
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.perf_counter()
+            try:
+                batch.append(self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            started = time.perf_counter()
+            for request in batch:
+                self.wait_ms.observe((started - request.enqueued_at) * 1000)
+            self.batch_sizes.observe(len(batch))
+            try:
+                embeddings = self.model.encode([request.text for request in batch], batch_size=len(batch))
+                count_encode('user_batched', len(batch))
+            except Exception as e:
+                for request in batch:
+                    request.future.set_exception(e)
+                continue
+            with self._lock:
+                self.batches += 1
+                self.items += len(batch)
+            for request, embedding in zip(batch, embeddings):
+                request.future.set_result(embedding)
+
+    def stats(self) -> Dict:
+        """Queue depth, batch size and wait time distributions."""
+        return {
+            'queue_depth': self._queue.qsize(),
+            'batches': self.batches,
+            'items': self.items,
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait_ms,
+            'batch_size': self.batch_sizes.snapshot(),
+            'wait_ms': self.wait_ms.snapshot()
+        }
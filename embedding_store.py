@@ -0,0 +1,160 @@
+import hashlib
+import json
+import os
+import numpy as np
+from typing import Callable, Dict, List, Optional
+
+STORE_FORMAT_VERSION = 1
+
+def text_keys(texts: List[str]) -> np.ndarray:
+    """Content keys for texts: a 128-bit BLAKE2b digest per text as (n, 2) uint64."""
+    digests = b''.join(hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest() for text in texts)
+    return np.frombuffer(digests, dtype=np.uint64).reshape(len(texts), 2)
+
+class EmbeddingStore:
+    """Content-addressed on-disk store for embedding matrices.
+
+    Each named matrix is saved as three files in the store directory:
+    <name>.npy holds the embeddings, <name>.keys.npy holds one content hash per
+    row, and <name>.json is a small manifest with the model name and format
+    version. If the model or format version changes, the matrix is treated as
+    missing. On load, rows whose text hash is already stored are reused.
+    Only new or changed texts are sent to the encoder. An unchanged catalog is
+    returned as a read-only memory map with no copies.
+    """
+    def __init__(self, directory: str, model_name: str):
+        self.directory = directory
+        self.model_name = model_name
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, name: str, suffix: str) -> str:
+        return os.path.join(self.directory, f'{name}{suffix}')
+
+    def _read_manifest(self, name: str) -> Optional[Dict]:
+        """Return the manifest for name if it exists and matches this model and format."""
+        try:
+            with open(self._path(name, '.json')) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if manifest.get('format_version') != STORE_FORMAT_VERSION or manifest.get('model_name') != self.model_name:
+            return None
+        return manifest
+
+    def load_matrix(self, name: str, texts: List[str], embed_fn: Callable[[List[str]], np.ndarray]) -> np.ndarray:
+        """Return the embedding matrix for texts, computing only rows not already stored.
+
+        embed_fn receives the list of texts to compute and must return one row
+        per text; it is always called at most once, with every missing text.
+        """
+        keys = text_keys(texts)
+        stored = stored_keys = None
+        if self._read_manifest(name) is not None:
+            try:
+                stored = np.load(self._path(name, '.npy'), mmap_mode='r')
+                stored_keys = np.load(self._path(name, '.keys.npy'), mmap_mode='r')
+            except (OSError, ValueError):
+                stored = stored_keys = None
+
+        if stored is not None and np.array_equal(stored_keys, keys):
+            return stored
+
+        positions = {}
+        if stored is not None:
+            positions = {key.tobytes(): row for row, key in enumerate(stored_keys)}
+
+        # Encode each missing text once, even if several rows share it
+        missing = {}
+        for row, key in enumerate(keys):
+            key_bytes = key.tobytes()
+            if key_bytes not in positions and key_bytes not in missing:
+                missing[key_bytes] = row
+        computed = embed_fn([texts[row] for row in missing.values()])
+        computed_rows = {key_bytes: i for i, key_bytes in enumerate(missing)}
+
+        dim = stored.shape[1] if stored is not None else computed.shape[1]
+        matrix = np.empty((len(texts), dim), dtype=np.float32)
+        for row, key in enumerate(keys):
+            key_bytes = key.tobytes()
+            if key_bytes in computed_rows:
+                matrix[row] = computed[computed_rows[key_bytes]]
+            else:
+                matrix[row] = stored[positions[key_bytes]]
+
+        self.save_matrix(name, matrix, keys)
+        return np.load(self._path(name, '.npy'), mmap_mode='r')
+
+    def save_matrix(self, name: str, matrix: np.ndarray, keys: np.ndarray):
+        """Atomically replace the stored matrix, keys and manifest for name."""
+        # Drop the manifest first so a crash mid-save reads as a missing matrix
+        try:
+            os.remove(self._path(name, '.json'))
+        except FileNotFoundError:
+            pass
+        for suffix, array in (('.npy', matrix), ('.keys.npy', keys)):
+            tmp_path = self._path(name, suffix + '.tmp')
+            with open(tmp_path, 'wb') as f:
+                np.save(f, array)
+            os.replace(tmp_path, self._path(name, suffix))
+
+        manifest = {
+            'format_version': STORE_FORMAT_VERSION,
+            'model_name': self.model_name,
+            'count': int(len(matrix)),
+            'dim': int(matrix.shape[1])
+        }
+        tmp_path = self._path(name, '.json.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, self._path(name, '.json'))
+
+    def load_rows(self, name: str, texts: List[str], embed_fn: Callable[[List[str]], np.ndarray]) -> np.ndarray:
+        """Return one embedding per text from an unordered pool of rows, computing only new texts.
+
+        Unlike load_matrix, the pool under name is not tied to one text list:
+        it keeps every text it has been asked for, so rows embedded by earlier
+        calls (or other processes) are reused. The pool is a single file
+        replaced atomically, so concurrent writers can only lose rows, never
+        pair a key with the wrong row.
+        """
+        keys = text_keys(texts)
+        stored_keys, stored = self._read_pool(name)
+        positions = {key.tobytes(): row for row, key in enumerate(stored_keys)} if stored is not None else {}
+
+        missing = {}
+        for row, key in enumerate(keys):
+            key_bytes = key.tobytes()
+            if key_bytes not in positions and key_bytes not in missing:
+                missing[key_bytes] = row
+        if not missing:
+            return np.array(stored[[positions[key.tobytes()] for key in keys]], dtype=np.float32)
+
+        computed = np.asarray(embed_fn([texts[row] for row in missing.values()]), dtype=np.float32)
+        new_keys = keys[list(missing.values())]
+        if stored is not None and stored.shape[1] == computed.shape[1]:
+            pool_keys, pool = np.concatenate((stored_keys, new_keys)), np.concatenate((stored, computed))
+        else:
+            pool_keys, pool, positions = new_keys, computed, {}
+        self._write_pool(name, pool_keys, pool)
+
+        offset = len(pool) - len(computed)
+        positions.update((key_bytes, offset + i) for i, key_bytes in enumerate(missing))
+        return pool[[positions[key.tobytes()] for key in keys]]
+
+    def _read_pool(self, name: str):
+        """(keys, matrix) of the row pool for name, or (None, None) if missing or stale."""
+        try:
+            with np.load(self._path(name, '.rows.npz')) as pool:
+                if int(pool['format_version']) != STORE_FORMAT_VERSION or str(pool['model_name']) != self.model_name:
+                    return None, None
+                return pool['keys'], pool['matrix']
+        except (OSError, ValueError, KeyError):
+            return None, None
+
+    def _write_pool(self, name: str, keys: np.ndarray, matrix: np.ndarray):
+        # Per-process temporary file: several workers may apply the same update
+        tmp_path = self._path(name, f'.rows.{os.getpid()}.tmp')
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, keys=keys, matrix=matrix, format_version=np.array(STORE_FORMAT_VERSION),
+                     model_name=np.array(self.model_name))
+        os.replace(tmp_path, self._path(name, '.rows.npz'))
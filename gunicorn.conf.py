@@ -0,0 +1,35 @@
+"""Production serving with pre-forked workers (Linux/macOS).
+
+    gunicorn -c gunicorn.conf.py app:app
+
+The app is imported and warmed once in the master before any worker forks.
+That covers the SentenceTransformer weights, the memory-mapped job
+embeddings and ANN index, and the suggestion index. Workers share those
+pages copy-on-write instead of each loading its own copy. Job embeddings
+are read-only memory maps from the embedding store, so they stay shared
+until a live catalog update (catalog_sync.py) gives a worker its own copy.
+"""
+import gc
+import os
+
+bind = os.environ.get('BIND', '127.0.0.1:5001')
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+# Threads per worker feed the micro-batching encoder concurrently
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+preload_app = True
+timeout = 120
+
+def when_ready(server):
+    import app
+    app.warm_up()
+    # Stop the cyclic GC from touching (and so un-sharing) objects created
+    # before the fork
+    gc.freeze()
+
+def post_fork(server, worker):
+    # Avoid every worker spawning one torch thread per core
+    torch_threads = os.environ.get('JOB_MATCHER_TORCH_THREADS')
+    if torch_threads:
+        import torch
+        torch.set_num_threads(int(torch_threads))
@@ -1,21 +1,176 @@
-from sentence_transformers import SentenceTransformer
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
+import hashlib
 import json
+import threading
 import pandas as pd
-from typing import List, Dict, Tuple
+from typing import List, Dict, Mapping, Tuple, Optional, Union
+from ann_index import IVFIndex, catalog_fingerprint, top_k_rows
+from catalog_snapshot import CatalogSnapshot, overlay
+from row_buffer import RowBuffer
+from embedding_store import EmbeddingStore
+from embedding_cache import EmbeddingCache, normalize_text, skills_text
+from skill_suggester import SkillSuggestionIndex, SkillSuggestionOverlay
+from onet_store import OnetStore
+from embedding_executor import BatchingEncoder
+from skill_index import GAP_CATEGORIES, SkillIndex, normalize_skill
+from metrics import count_encode, stage
+
+# Category weights from the paper's formula (Equation 1)
+CATEGORY_WEIGHTS = {
+    'skills': 0.30,
+    'abilities': 0.20,
+    'knowledge': 0.20,
+    'work_activities': 0.15,
+    'technology_skills': 0.15
+}
+
+# Fields every job needs for embedding and result payloads
+REQUIRED_JOB_FIELDS = ('title', 'description', 'skills', 'abilities', 'knowledge')
+# Fields that, when present, must be lists of strings
+JOB_LIST_FIELDS = ('skills', 'abilities', 'knowledge', 'work_activities', 'tools_used', 'technology_skills')
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalize a vector or each row of a matrix; all-zero rows stay zero."""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return np.ascontiguousarray(matrix / norms)
+
+def retrieval_vectors(job_embeddings: np.ndarray, category_embeddings: Dict[str, np.ndarray],
+                      rows: Optional[np.ndarray] = None) -> np.ndarray:
+    """(n_rows, 2 * dim) job vectors for ANN candidate retrieval.
+
+    Jobs are ranked by (score + 50 * similarity) / 2, where score sums
+    100 * weight * max(category similarity, 0). Without the clipping that is
+    the inner product of [sum(50 * weight * category rows), 25 * job row] with
+    retrieval_query, so candidates are retrieved for the final ranking
+    rather than for profile similarity alone.
+    """
+    def select(matrix):
+        return matrix if rows is None else matrix[rows]
+    job_part = select(job_embeddings)
+    dim = job_part.shape[1]
+    vectors = np.zeros((len(job_part), 2 * dim), dtype=np.float32)
+    for category, weight in CATEGORY_WEIGHTS.items():
+        vectors[:, :dim] += 50 * weight * select(category_embeddings[category])
+    vectors[:, dim:] = 25 * job_part
+    return vectors
+
+def retrieval_query(user_embedding: np.ndarray, skills_embedding: np.ndarray) -> np.ndarray:
+    """Query vector matching retrieval_vectors for one user."""
+    return np.concatenate((normalize_rows(skills_embedding), normalize_rows(user_embedding)))
 
 class JobMatcher:
-    def __init__(self):
-        self.model = SentenceTransformer('all-mpnet-base-v2')
+    def __init__(self, index_dir: Optional[str] = None, store_dir: Optional[str] = None,
+                 cache_size: int = 4096, onet_store: Optional[str] = None,
+                 model=None, onet_data: Optional[Dict] = None):
+        if model is None:
+            # Imported here so callers injecting their own encoder (benchmarks) need no torch
+            from sentence_transformers import SentenceTransformer
+            self.model_name = 'all-mpnet-base-v2'
+            model = SentenceTransformer(self.model_name)
+        else:
+            # Keeps injected encoders apart from the real model in the embedding store and result cache
+            self.model_name = getattr(model, 'model_name', type(model).__name__)
+        self.model = model
+        self.encode_batch_size = 256
+        # Optional on-disk cache of the job-side embedding matrices
+        self.embedding_store = EmbeddingStore(store_dir, self.model_name) if store_dir else None
+        # LRU cache of user-side embeddings, shared by all request threads
+        self.embedding_cache = EmbeddingCache(cache_size)
+        # Optional micro-batching executor for user-side encodes (see enable_micro_batching)
+        self.encoder = None
         self.threshold = 0.1
         self.min_score = 10.0
-        self.onet_data = self.load_onet_data()
-        self.job_embeddings = self.precompute_job_embeddings()
+        # Compact O*NET store built by onet_store.py; the mock catalog is used without one
+        self.onet_store_path = onet_store
+        if onet_data is None:
+            onet_data = self.load_onet_data()
+        # Versions keying persisted match results (result_cache.py); any change invalidates them
+        self.model_version = f"{self.model_name}:threshold={self.threshold}:min_score={self.min_score}"
+        # Serializes catalog writers; readers never take it (see catalog_snapshot.py)
+        self._update_lock = threading.Lock()
+        self.snapshot = self.build_snapshot(onet_data)
+        self.reset_row_buffers(self.snapshot)
+        self.n_candidates = 100
+        # Appended rows are searched exactly until they exceed this fraction of the
+        # catalog (at least 1000 rows), then the ANN index is rebuilt
+        self.unindexed_fraction = 0.1
+        # Retired rows are dropped by a compaction once they exceed this fraction
+        self.compaction_fraction = 0.25
+        # Upper bound on (profiles x jobs) score elements per find_matches_batch chunk
+        self.batch_score_elements = 16 * 1024 * 1024
+        if index_dir:
+            self.load_index(index_dir)
         
+    def build_snapshot(self, onet_data: Mapping[str, Dict], version: int = 0) -> CatalogSnapshot:
+        """Embed and index a whole catalog; the ANN index is attached by load_index."""
+        job_ids = np.array(list(onet_data.keys()), dtype=object)
+        job_embeddings = self.precompute_job_embeddings(onet_data)
+        category_embeddings = self.precompute_category_embeddings(onet_data)
+        return CatalogSnapshot(
+            version=version,
+            catalog_version=self.compute_catalog_version(onet_data),
+            onet_data=onet_data,
+            # Row order of every embedding matrix
+            job_ids=job_ids,
+            job_index={job_id: row for row, job_id in enumerate(job_ids)},
+            live=np.ones(len(job_ids), dtype=bool),
+            job_embeddings=job_embeddings,
+            category_embeddings=category_embeddings,
+            # Autocomplete index, updated incrementally with the catalog
+            suggestion_index=SkillSuggestionIndex.from_catalog(onet_data),
+            # Interned catalog skills for vectorized match and gap analysis
+            skill_index=SkillIndex(onet_data.values()),
+            # Optional ANN retrieval backend; None means exact brute-force scoring
+            index=None,
+            unindexed_rows=np.empty(0, dtype=np.int64)
+        )
+    
+    # Read-only views of the current snapshot, for callers outside the request path
+    @property
+    def onet_data(self) -> Mapping[str, Dict]:
+        return self.snapshot.onet_data
+    
+    @property
+    def job_ids(self) -> np.ndarray:
+        return self.snapshot.job_ids
+    
+    @property
+    def job_index(self) -> Mapping[str, int]:
+        return self.snapshot.job_index
+    
+    @property
+    def catalog_version(self) -> str:
+        return self.snapshot.catalog_version
+    
+    @property
+    def job_embeddings(self) -> np.ndarray:
+        return self.snapshot.job_embeddings
+    
+    @property
+    def category_embeddings(self) -> Dict[str, np.ndarray]:
+        return self.snapshot.category_embeddings
+    
+    @property
+    def suggestion_index(self) -> Union[SkillSuggestionIndex, SkillSuggestionOverlay]:
+        return self.snapshot.suggestion_index
+    
+    @property
+    def skill_index(self) -> SkillIndex:
+        return self.snapshot.skill_index
+    
+    @property
+    def index(self) -> Optional[IVFIndex]:
+        return self.snapshot.index
+    
     def load_onet_data(self) -> Dict:
         """Load O*NET job data with skills, abilities, knowledge, etc."""
-        # Mock O*NET data - in production, this would be loaded from actual O*NET database
+        if self.onet_store_path:
+            # Lazily decoded job_id -> job dict mapping over the SQLite store
+            return OnetStore(self.onet_store_path)
+        
+        # Mock O*NET data - used when no O*NET store has been built
         return {
             "15-1132.00": {
                 "title": "Software Developer",
@@ -74,148 +229,510 @@ class JobMatcher:
             }
         }
     
-    def precompute_job_embeddings(self) -> Dict:
-        """Precompute embeddings for all jobs to improve performance."""
-        embeddings = {}
-        for job_id, job_data in self.onet_data.items():
-            # Combine all relevant text for embedding
-            combined_text = f"{job_data['title']} {job_data['description']} {' '.join(job_data['skills'])} {' '.join(job_data['abilities'])} {' '.join(job_data['knowledge'])}"
-            embeddings[job_id] = self.model.encode([combined_text])[0]
-        return embeddings
+    def compute_catalog_version(self, onet_data: Optional[Mapping[str, Dict]] = None) -> str:
+        """Hash of every job's full data, in catalog order."""
+        onet_data = self.onet_data if onet_data is None else onet_data
+        return catalog_fingerprint([
+            f"{job_id}\t{json.dumps(job_data, sort_keys=True)}" for job_id, job_data in onet_data.items()
+        ])
     
-    def find_matches(self, user_skills: List[str], job_preference: str = "") -> List[Dict]:
-        """Find job matches based on user skills and preferences."""
-        # Create user profile embedding
-        user_profile = ' '.join(user_skills)
-        if job_preference:
-            user_profile += f" {job_preference}"
-        
-        user_embedding = self.model.encode([user_profile])[0]
+    def job_text(self, job_data: Dict) -> str:
+        """Combine all relevant job text for the overall embedding."""
+        return f"{job_data['title']} {job_data['description']} {' '.join(job_data['skills'])} {' '.join(job_data['abilities'])} {' '.join(job_data['knowledge'])}"
+    
+    def embed_texts(self, texts: List[str]) -> np.ndarray:
+        """Encode texts in large batches into a normalized (len(texts), dim) matrix.
+
+        Empty texts are not encoded and get an all-zero row.
+        """
+        matrix = np.zeros((len(texts), self.model.get_sentence_embedding_dimension()), dtype=np.float32)
+        rows = [row for row, text in enumerate(texts) if text]
+        if rows:
+            matrix[rows] = self.model.encode([texts[row] for row in rows], batch_size=self.encode_batch_size)
+            count_encode('catalog', len(rows))
+        return normalize_rows(matrix)
+    
+    def load_embeddings(self, name: str, texts: List[str]) -> np.ndarray:
+        """Embed texts, reusing unchanged rows from the embedding store if configured."""
+        if self.embedding_store is None:
+            return self.embed_texts(texts)
+        return self.embedding_store.load_matrix(name, texts, self.embed_texts)
+    
+    def load_update_embeddings(self, texts: List[str]) -> np.ndarray:
+        """Embed catalog update texts, reusing rows any earlier update stored."""
+        if self.embedding_store is None:
+            return self.embed_texts(texts)
+        return self.embedding_store.load_rows('catalog_updates', texts, self.embed_texts)
+    
+    def precompute_job_embeddings(self, onet_data: Optional[Mapping[str, Dict]] = None) -> np.ndarray:
+        """Precompute a normalized (n_jobs, dim) embedding matrix for all jobs."""
+        onet_data = self.onet_data if onet_data is None else onet_data
+        texts = [self.job_text(job_data) for job_data in onet_data.values()]
+        return self.load_embeddings('jobs', texts)
+    
+    def category_texts(self, jobs) -> Dict[str, List[str]]:
+        """Per-category texts of jobs, in order; a missing category gives an empty text."""
+        texts = {category: [] for category in CATEGORY_WEIGHTS}
+        for job_data in jobs:
+            for category in CATEGORY_WEIGHTS:
+                texts[category].append(' '.join(job_data.get(category) or []))
+        return texts
+    
+    def precompute_category_embeddings(self, onet_data: Optional[Mapping[str, Dict]] = None) -> Dict[str, np.ndarray]:
+        """Precompute a normalized (n_jobs, dim) embedding matrix per category.
+
+        Job-side category texts never change, so they are encoded once here
+        instead of on every request. Jobs with a missing or empty category get
+        an all-zero row, which scores 0 for that category.
+        """
+        onet_data = self.onet_data if onet_data is None else onet_data
+        # One pass over the catalog, in job_ids order
+        texts = self.category_texts(onet_data.values())
         
-        matches = []
+        return {
+            category: self.load_embeddings(f'category_{category}', category_texts)
+            for category, category_texts in texts.items()
+        }
+    
+    def load_index(self, index_dir: str, n_lists: Optional[int] = None, n_probe: int = 32):
+        """Load the ANN index from index_dir, building and saving it if missing or stale.
+
+        The index is built over retrieval_vectors. Its fingerprint covers the
+        model, embedding dimension, category weights and every embedded job
+        text, so an index built for anything else is never loaded. n_probe
+        applies to loaded indexes too; n_lists only to a new build.
+        """
+        with self._update_lock:
+            snapshot = self.snapshot
+            category_texts = self.category_texts(snapshot.onet_data.values())
+            fingerprint = catalog_fingerprint(
+                [f"model\t{self.model_name}\t{snapshot.job_embeddings.shape[1]}\t{json.dumps(CATEGORY_WEIGHTS)}"] +
+                ['\t'.join((job_id, self.job_text(job_data)) + texts)
+                 for (job_id, job_data), texts in zip(snapshot.onet_data.items(), zip(*category_texts.values()))]
+            )
+            index = IVFIndex.load(index_dir, n_probe=n_probe, fingerprint=fingerprint)
+            if index is None:
+                vectors = retrieval_vectors(snapshot.job_embeddings, snapshot.category_embeddings)
+                index = IVFIndex.build(vectors, n_lists, n_probe, fingerprint=fingerprint)
+                index.save(index_dir)
+            self.snapshot = snapshot._replace(index=index, unindexed_rows=np.empty(0, dtype=np.int64))
+    
+    def measure_index_recall(self, k: int = 5, sample_size: int = 100) -> Dict:
+        """Recall@k of find_matches through the ANN index against brute-force find_matches.
+
+        Each query is the skill list of a sampled catalog job, ranked with the
+        full matching formula, so this measures the results the API returns.
+        """
+        snapshot = self.snapshot
+        if snapshot.index is None:
+            return {'k': k, 'queries': 0, 'recall': 1.0}
+        exact = snapshot._replace(index=None)
+        job_ids = list(snapshot.onet_data)
+        rng = np.random.default_rng(0)
+        sample = np.sort(rng.choice(len(job_ids), min(sample_size, len(job_ids)), replace=False))
+        hits = 0
+        total = 0
+        for i in sample:
+            skills = snapshot.onet_data[job_ids[i]]['skills']
+            truth = {match['job_id'] for match in self.find_matches(skills, '', k, snapshot=exact)}
+            found = {match['job_id'] for match in self.find_matches(skills, '', k, snapshot=snapshot)}
+            hits += len(truth & found)
+            total += len(truth)
+        return {'k': k, 'queries': len(sample), 'recall': hits / total if total else 1.0}
+    
+    def validate_changes(self, changes: Dict[str, Optional[Dict]]):
+        """Raise ValueError unless every upserted job has the required fields with the right types."""
+        for job_id, job_data in changes.items():
+            if not isinstance(job_id, str) or not job_id:
+                raise ValueError(f"Job IDs must be non-empty strings, got {job_id!r}")
+            if job_data is None:
+                continue
+            if not isinstance(job_data, dict):
+                raise ValueError(f"Job {job_id} must be an object or null")
+            missing = [field for field in REQUIRED_JOB_FIELDS if field not in job_data]
+            if missing:
+                raise ValueError(f"Job {job_id} is missing {', '.join(missing)}")
+            for field in ('title', 'description'):
+                if not isinstance(job_data[field], str):
+                    raise ValueError(f"Job {job_id}: {field} must be a string")
+            for field in JOB_LIST_FIELDS:
+                items = job_data.get(field, [])
+                if not isinstance(items, list) or not all(isinstance(item, str) for item in items):
+                    raise ValueError(f"Job {job_id}: {field} must be a list of strings")
+    
+    def update_catalog(self, changes: Dict[str, Optional[Dict]], catalog_version: Optional[str] = None) -> CatalogSnapshot:
+        """Upsert (job_id -> job) or delete (job_id -> None) jobs and publish the next snapshot.
+
+        Only upserted jobs are embedded, in one model call that skips texts
+        already in the embedding store's update pool. Their rows are
+        appended to the embedding matrices and the rows they replace are
+        retired; the skill and suggestion indexes are updated in place of a
+        rebuild. Requests in flight keep the snapshot they started with.
+        catalog_version defaults to a hash of the previous version and changes.
+        """
+        self.validate_changes(changes)
         
-        for job_id, job_data in self.onet_data.items():
-            # Calculate similarity with precomputed embeddings
-            similarity = cosine_similarity(
-                [user_embedding], 
-                [self.job_embeddings[job_id]]
-            )[0][0]
+        with self._update_lock, stage('catalog_update'):
+            old = self.snapshot
+            # Deleting an unknown job is a no-op
+            changes = {job_id: job_data for job_id, job_data in changes.items()
+                       if job_data is not None or job_id in old.job_index}
+            if not changes:
+                return old
+            upserts = {job_id: job_data for job_id, job_data in changes.items() if job_data is not None}
+            n_rows, n_new = len(old.job_ids), len(upserts)
             
-            # Calculate detailed matching score using the paper's approach
-            score = self.calculate_matching_score(user_skills, job_data)
+            job_ids, job_embeddings, category_embeddings = old.job_ids, old.job_embeddings, old.category_embeddings
+            if upserts:
+                texts = self.category_texts(upserts.values())
+                texts['jobs'] = [self.job_text(job_data) for job_data in upserts.values()]
+                names = list(texts)
+                embedded = self.load_update_embeddings([text for name in names for text in texts[name]])
+                rows = {name: embedded[i * n_new:(i + 1) * n_new] for i, name in enumerate(names)}
+                job_embeddings = self._row_buffers['jobs'].append(n_rows, rows['jobs'])
+                job_ids = self._row_buffers['job_ids'].append(n_rows, np.array(list(upserts), dtype=object))
+                category_embeddings = {category: self._row_buffers[category].append(n_rows, rows[category])
+                                       for category in CATEGORY_WEIGHTS}
             
-            if similarity >= self.threshold or score >= self.min_score:
-                matches.append({
-                    'job_id': job_id,
-                    'title': job_data['title'],
-                    'description': job_data['description'],
-                    'similarity': float(similarity),
-                    'score': float(score),
-                    'skills_match': self.get_skills_match(user_skills, job_data['skills']),
-                    'missing_skills': self.get_missing_skills(user_skills, job_data)
-                })
+            # Copied rather than shared: retiring a row must not change older snapshots
+            live = np.concatenate((old.live, np.ones(n_new, dtype=bool)))
+            live[[old.job_index[job_id] for job_id in changes if job_id in old.job_index]] = False
+            row_changes = dict.fromkeys(changes)
+            row_changes.update((job_id, n_rows + i) for i, job_id in enumerate(upserts))
+            job_index = overlay(old.job_index, row_changes)
+            onet_data = overlay(old.onet_data, changes)
+            removed = [old.onet_data[job_id] for job_id in changes if job_id in old.job_index]
+            
+            index, unindexed_rows = old.index, old.unindexed_rows
+            if index is not None and n_new:
+                unindexed_rows = np.concatenate((unindexed_rows, np.arange(n_rows, n_rows + n_new)))
+                if len(unindexed_rows) > max(1000, self.unindexed_fraction * len(job_index)):
+                    index = IVFIndex.build(retrieval_vectors(job_embeddings, category_embeddings),
+                                           index.n_lists or None, index.n_probe)
+                    unindexed_rows = np.empty(0, dtype=np.int64)
+            
+            snapshot = CatalogSnapshot(
+                version=old.version + 1,
+                catalog_version=catalog_version or hashlib.sha1(
+                    (old.catalog_version + json.dumps(changes, sort_keys=True)).encode('utf-8')
+                ).hexdigest(),
+                onet_data=onet_data,
+                job_ids=job_ids,
+                job_index=job_index,
+                live=live,
+                job_embeddings=job_embeddings,
+                category_embeddings=category_embeddings,
+                suggestion_index=old.suggestion_index.with_changes(removed, upserts.values()),
+                skill_index=old.skill_index.append(list(upserts.values())) if upserts else old.skill_index,
+                index=index,
+                unindexed_rows=unindexed_rows
+            )
+            if len(live) - len(job_index) > self.compaction_fraction * len(live):
+                snapshot = self.compact(snapshot)
+                self.reset_row_buffers(snapshot)
+            # A single reference swap publishes the new version to every reader
+            self.snapshot = snapshot
+            return snapshot
+    
+    def reset_row_buffers(self, snapshot: CatalogSnapshot):
+        """Start appending after snapshot's matrices; called under _update_lock or during __init__."""
+        self._row_buffers = {'job_ids': RowBuffer(snapshot.job_ids, dtype=object), 'jobs': RowBuffer(snapshot.job_embeddings)}
+        self._row_buffers.update({category: RowBuffer(matrix) for category, matrix in snapshot.category_embeddings.items()})
+    
+    def compact(self, snapshot: CatalogSnapshot) -> CatalogSnapshot:
+        """A copy of snapshot without retired rows; the matrices are gathered, not re-embedded."""
+        rows = np.flatnonzero(snapshot.live)
+        job_ids = snapshot.job_ids[rows]
+        job_embeddings = snapshot.job_embeddings[rows]
+        category_embeddings = {category: matrix[rows] for category, matrix in snapshot.category_embeddings.items()}
+        index = snapshot.index
+        if index is not None:
+            index = IVFIndex.build(retrieval_vectors(job_embeddings, category_embeddings),
+                                   index.n_lists or None, index.n_probe)
+        return snapshot._replace(
+            job_ids=job_ids,
+            job_index={job_id: row for row, job_id in enumerate(job_ids)},
+            live=np.ones(len(job_ids), dtype=bool),
+            job_embeddings=job_embeddings,
+            category_embeddings=category_embeddings,
+            skill_index=SkillIndex([snapshot.onet_data[job_id] for job_id in job_ids]),
+            index=index,
+            unindexed_rows=np.empty(0, dtype=np.int64)
+        )
+    
+    def encode_texts(self, texts: List[str]) -> List[np.ndarray]:
+        """Encode user-side texts through the LRU cache.
+
+        Cache misses are encoded together in a single model call; repeated texts
+        skip the model entirely. Returned embeddings are normalized and read-only.
+        """
+        embeddings = [self.embedding_cache.get(text) for text in texts]
+        missing = list(dict.fromkeys(text for text, embedding in zip(texts, embeddings) if embedding is None))
         
-        # Sort by combined score
-        matches.sort(key=lambda x: (x['score'] + x['similarity'] * 50) / 2, reverse=True)
+        if missing:
+            encoded = dict(zip(missing, normalize_rows(self.encode_uncached(missing))))
+            for text, embedding in encoded.items():
+                self.embedding_cache.put(text, embedding)
+            embeddings = [encoded[text] if embedding is None else embedding
+                          for text, embedding in zip(texts, embeddings)]
         
-        return matches[:5]  # Return top 5 matches
+        return embeddings
     
-    def calculate_matching_score(self, user_skills: List[str], job_data: Dict) -> float:
-        """Calculate matching score based on the paper's formula (Equation 1)."""
-        weights = {
-            'skills': 0.30,
-            'abilities': 0.20,
-            'knowledge': 0.20,
-            'work_activities': 0.15,
-            'technology_skills': 0.15
-        }
+    def warm_up(self):
+        """Run one encode and scoring pass so the first real request pays no one-off costs.
+
+        Calls the model directly rather than through the micro-batching
+        executor, so no worker thread is started in a pre-fork master.
+        """
+        embedding = normalize_rows(self.model.encode(['python sql communication'])[0])
+        self.job_embeddings @ embedding
+        self.score_jobs(embedding)
+        self.get_skill_suggestions('py')
+    
+    def enable_micro_batching(self, max_batch_size: int = 32, max_wait_ms: float = 5.0):
+        """Route small user-side encodes from all request threads through one batching executor."""
+        self.encoder = BatchingEncoder(self.model, max_batch_size, max_wait_ms)
+    
+    def encode_uncached(self, texts: List[str]) -> np.ndarray:
+        """Run the model on texts, coalescing small requests when micro-batching is enabled.
+
+        Requests that already fill a batch go straight to the model.
+        """
+        if self.encoder is not None and len(texts) < self.encoder.max_batch_size:
+            return self.encoder.encode(texts)
+        count_encode('user', len(texts))
+        return self.model.encode(texts, batch_size=self.encode_batch_size)
+    
+    def user_texts(self, user_skills: List[str], job_preference: str = "") -> Tuple[str, str]:
+        """Build the (profile_text, skills_text) pair for a user; both are also cache keys.
+
+        The profile text includes the job preference and drives overall
+        similarity; category scores use the skills text alone. Only case and
+        whitespace are normalized, so the model sees the user's own order.
+        """
+        user_skills_text = skills_text(user_skills)
+        profile_text = user_skills_text
+        if job_preference.strip():
+            profile_text += f" {normalize_text(job_preference)}"
+        return profile_text, user_skills_text
+    
+    def encode_user(self, user_skills: List[str], job_preference: str = "") -> Tuple[np.ndarray, np.ndarray]:
+        """Encode the user with at most one model call; returns (profile_embedding, skills_embedding)."""
+        profile_text, skills_text = self.user_texts(user_skills, job_preference)
         
-        total_score = 0
+        with stage('user_encoding'):
+            if profile_text == skills_text:
+                embedding = self.encode_texts([skills_text])[0]
+                return embedding, embedding
+            
+            profile_embedding, skills_embedding = self.encode_texts([profile_text, skills_text])
+        return profile_embedding, skills_embedding
+    
+    def find_matches(self, user_skills: List[str], job_preference: str = "", top_k: int = 5,
+                     snapshot: Optional[CatalogSnapshot] = None) -> List[Dict]:
+        """Find job matches based on user skills and preferences.
+
+        Everything is read from one catalog snapshot (the current one unless
+        given), so a concurrent update_catalog never mixes two versions.
+        """
+        snapshot = snapshot or self.snapshot
+        # Encode the user once and reuse it for every job and category
+        user_embedding, skills_embedding = self.encode_user(user_skills, job_preference)
         
-        for category, weight in weights.items():
-            if category in job_data:
-                category_score = self.calculate_category_score(user_skills, job_data[category])
-                total_score += category_score * weight
+        user_embedding = normalize_rows(user_embedding)
         
-        return total_score * 100  # Convert to percentage
-    
-    def calculate_category_score(self, user_skills: List[str], job_requirements: List[str]) -> float:
-        """Calculate similarity score for a specific category."""
-        if not job_requirements:
-            return 0
+        if snapshot.index is None:
+            similarities = snapshot.job_embeddings @ user_embedding
+            scores = self.score_jobs(skills_embedding, snapshot=snapshot)
+            return self.rank_matches(user_skills, similarities, scores, top_k, snapshot=snapshot)
         
-        user_text = ' '.join(user_skills)
-        job_text = ' '.join(job_requirements)
+        # Approximate retrieval, then exact re-ranking of the candidate set
+        n_candidates = max(self.n_candidates, top_k)
+        query = retrieval_query(user_embedding, skills_embedding)
+        rows, _ = snapshot.index.search(query, n_candidates)
+        if len(snapshot.unindexed_rows):
+            # Rows added since the index was built are few; search them exactly
+            unindexed = snapshot.unindexed_rows
+            vectors = retrieval_vectors(snapshot.job_embeddings, snapshot.category_embeddings, unindexed)
+            nearest = top_k_rows(vectors @ query, n_candidates)
+            rows = np.concatenate((rows, unindexed[nearest]))
+        rows = np.sort(rows)
+        rows = rows[snapshot.live[rows]]
+        similarities = snapshot.job_embeddings[rows] @ user_embedding
+        scores = self.score_jobs(skills_embedding, rows, snapshot)
+        return self.rank_matches(user_skills, similarities, scores, top_k, rows, snapshot)
+    
+    def find_matches_batch(self, profiles: List[Dict], top_k: int = 5) -> List[List[Dict]]:
+        """Find job matches for many {'skills', 'job_preference'} profiles at once.
+
+        All profiles are encoded in one batched model call (cache hits skip the
+        model) and scored against the whole catalog as matrix-matrix products,
+        in chunks of profiles so the (profiles, jobs) score matrices stay bounded.
+        Returns one find_matches-shaped result list per profile, in order.
+        """
+        snapshot = self.snapshot
+        pairs = [self.user_texts(profile.get('skills', []), profile.get('job_preference', ''))
+                 for profile in profiles]
+        texts = list(dict.fromkeys(text for pair in pairs for text in pair))
+        with stage('user_encoding'):
+            embeddings = dict(zip(texts, self.encode_texts(texts)))
         
-        user_embedding = self.model.encode([user_text])[0]
-        job_embedding = self.model.encode([job_text])[0]
+        results = []
+        chunk_size = max(1, self.batch_score_elements // max(1, len(snapshot.job_ids)))
+        for start in range(0, len(profiles), chunk_size):
+            chunk = pairs[start:start + chunk_size]
+            profile_matrix = np.vstack([embeddings[profile_text] for profile_text, _ in chunk])
+            skills_matrix = np.vstack([embeddings[skills_text] for _, skills_text in chunk])
+            
+            similarities = profile_matrix @ snapshot.job_embeddings.T
+            scores = self.score_jobs(skills_matrix, snapshot=snapshot)
+            for i, profile in enumerate(profiles[start:start + chunk_size]):
+                results.append(self.rank_matches(profile.get('skills', []), similarities[i], scores[i], top_k,
+                                                 snapshot=snapshot))
         
-        similarity = cosine_similarity([user_embedding], [job_embedding])[0][0]
-        return max(0, similarity)
+        return results
     
-    def get_skills_match(self, user_skills: List[str], job_skills: List[str]) -> Dict:
-        """Get detailed skills matching information."""
-        user_skills_lower = [skill.lower() for skill in user_skills]
-        job_skills_lower = [skill.lower() for skill in job_skills]
+    def score_jobs(self, skills_embedding: np.ndarray, rows: Optional[np.ndarray] = None,
+                   snapshot: Optional[CatalogSnapshot] = None) -> np.ndarray:
+        """Vectorized calculate_matching_score over the catalog, or only the given rows.
+
+        skills_embedding may be one vector, giving (n_jobs,) scores, or a
+        (n_users, dim) matrix, giving (n_users, n_jobs) scores.
+        """
+        snapshot = snapshot or self.snapshot
+        skills_embedding = normalize_rows(skills_embedding)
+        n_jobs = len(snapshot.job_ids) if rows is None else len(rows)
+        total_score = np.zeros(skills_embedding.shape[:-1] + (n_jobs,), dtype=np.float32)
         
-        matched = []
-        for skill in job_skills:
-            if skill.lower() in user_skills_lower:
-                matched.append(skill)
+        for category, weight in CATEGORY_WEIGHTS.items():
+            with stage(f'score_{category}'):
+                matrix = snapshot.category_embeddings[category]
+                if rows is not None:
+                    matrix = matrix[rows]
+                category_scores = skills_embedding @ matrix.T
+                total_score += np.maximum(category_scores, 0) * weight
         
-        return {
-            'matched_skills': matched,
-            'match_percentage': (len(matched) / len(job_skills)) * 100 if job_skills else 0,
-            'total_required': len(job_skills),
-            'total_matched': len(matched)
-        }
+        return total_score * 100  # Convert to percentage
     
-    def get_missing_skills(self, user_skills: List[str], job_data: Dict) -> Dict:
-        """Get missing skills across all categories."""
-        user_skills_lower = [skill.lower() for skill in user_skills]
+    def rank_matches(self, user_skills: List[str], similarities: np.ndarray, scores: np.ndarray,
+                     top_k: int = 5, rows: Optional[np.ndarray] = None,
+                     snapshot: Optional[CatalogSnapshot] = None) -> List[Dict]:
+        """Filter, rank and build result payloads for the top_k jobs.
+
+        Filtering and ranking are array operations over the whole catalog (or the
+        candidate rows, when given); the detailed skills payloads are only built
+        for the winners. Rows retired by catalog updates never qualify.
+        """
+        if top_k <= 0:
+            return []
+        snapshot = snapshot or self.snapshot
         
-        missing = {
-            'skills': [],
-            'abilities': [],
-            'knowledge': [],
-            'technology_skills': []
-        }
+        with stage('ranking'):
+            eligible = (similarities >= self.threshold) | (scores >= self.min_score)
+            if snapshot.n_live < len(snapshot.live):
+                eligible &= snapshot.live if rows is None else snapshot.live[rows]
+            qualified = np.flatnonzero(eligible)
+            combined = (scores[qualified] + similarities[qualified] * 50) / 2
+        
+            if len(qualified) > top_k:
+                top = np.sort(np.argpartition(-combined, top_k - 1)[:top_k])
+            else:
+                top = np.arange(len(qualified))
+            # Stable sort keeps catalog order between equal combined scores
+            top = top[np.argsort(-combined[top], kind='stable')]
         
-        for category in missing.keys():
-            if category in job_data:
-                for item in job_data[category]:
-                    if item.lower() not in user_skills_lower:
-                        missing[category].append(item)
+            # One interned skill mask per request, shared by every result payload
+            skill_index = snapshot.skill_index
+            mask = skill_index.user_mask(user_skills)
+            matches = []
+            for row in qualified[top]:
+                job_row = row if rows is None else rows[row]
+                job_id = snapshot.job_ids[job_row]
+                job_data = snapshot.onet_data[job_id]
+                matches.append({
+                    'job_id': job_id,
+                    'title': job_data['title'],
+                    'description': job_data['description'],
+                    'similarity': float(similarities[row]),
+                    'score': float(scores[row]),
+                    'skills_match': skill_index.skills_match(job_row, mask),
+                    'missing_skills': skill_index.missing_skills(job_row, mask)
+                })
         
-        return missing
+            return matches
+    
+    def calculate_matching_score(self, job_id: str, skills_embedding: np.ndarray,
+                                 snapshot: Optional[CatalogSnapshot] = None) -> float:
+        """Calculate matching score based on the paper's formula (Equation 1)."""
+        snapshot = snapshot or self.snapshot
+        row = snapshot.job_index[job_id]
+        skills_embedding = normalize_rows(skills_embedding)
+        total_score = 0
+        
+        for category, weight in CATEGORY_WEIGHTS.items():
+            category_score = self.calculate_category_score(
+                skills_embedding, snapshot.category_embeddings[category][row]
+            )
+            total_score += category_score * weight
+        
+        return total_score * 100  # Convert to percentage
+    
+    def calculate_category_score(self, user_embedding: np.ndarray, job_embedding: np.ndarray) -> float:
+        """Calculate similarity score for a specific category from normalized embeddings."""
+        similarity = float(np.dot(user_embedding, job_embedding))
+        return max(0, similarity)
     
     def analyze_skill_gap(self, job_id: str, user_skills: List[str]) -> Dict:
         """Analyze skill gap for a specific job."""
-        if job_id not in self.onet_data:
+        snapshot = self.snapshot
+        if job_id not in snapshot.job_index:
             return {'error': 'Job not found'}
         
-        job_data = self.onet_data[job_id]
-        score = self.calculate_matching_score(user_skills, job_data)
+        job_data = snapshot.onet_data[job_id]
+        row = snapshot.job_index[job_id]
+        mask = snapshot.skill_index.user_mask(user_skills)
+        _, skills_embedding = self.encode_user(user_skills)
+        score = self.calculate_matching_score(job_id, skills_embedding, snapshot)
         
         return {
             'job_title': job_data['title'],
             'current_score': score,
             'qualification_threshold': self.min_score,
             'qualifies': score >= self.min_score,
-            'missing_skills': self.get_missing_skills(user_skills, job_data),
-            'skills_match': self.get_skills_match(user_skills, job_data['skills']),
+            'missing_skills': snapshot.skill_index.missing_skills(row, mask),
+            'skills_match': snapshot.skill_index.skills_match(row, mask),
             'hot_technologies': job_data.get('technology_skills', [])[:5]
         }
     
-    def get_skill_suggestions(self, query: str) -> List[str]:
-        """Get skill suggestions for autocomplete."""
-        all_skills = set()
-        
-        for job_data in self.onet_data.values():
-            all_skills.update(job_data.get('skills', []))
-            all_skills.update(job_data.get('technology_skills', []))
-        
-        query_lower = query.lower()
-        suggestions = [skill for skill in all_skills if query_lower in skill.lower()]
+    def catalog_skill_gap(self, user_skills: List[str], limit: int = 10) -> List[Dict]:
+        """Rank the whole catalog by how many listed skills the user already has.
+
+        Coverage over every gap category is computed for all jobs with array
+        operations; payloads are only built for the top limit jobs.
+        """
+        snapshot = self.snapshot
+        gap = snapshot.skill_index.catalog_gap(snapshot.skill_index.user_mask(user_skills))
+        matched = sum(gap[category]['matched'] for category in GAP_CATEGORIES)
+        missing = sum(gap[category]['missing'] for category in GAP_CATEGORIES)
+        required = matched + missing
+        coverage = np.divide(matched * 100.0, required, out=np.zeros(len(required)), where=required > 0)
+        live_rows = np.flatnonzero(snapshot.live)
+        # Highest coverage first, then fewest missing, then catalog order
+        top = live_rows[np.lexsort((live_rows, missing[live_rows], -coverage[live_rows]))[:limit]]
         
-        return sorted(suggestions)[:10]
\ No newline at end of file
+        return [{
+            'job_id': snapshot.job_ids[row],
+            'title': snapshot.onet_data[snapshot.job_ids[row]]['title'],
+            'coverage_percentage': float(coverage[row]),
+            'missing_count': int(missing[row]),
+            'missing_by_category': {category: int(gap[category]['missing'][row]) for category in GAP_CATEGORIES},
+            'skills_match_percentage': float(gap['skills']['match_percentage'][row])
+        } for row in top]
+    
+    def get_skill_suggestions(self, query: str, limit: int = 10) -> List[str]:
+        """Get skill suggestions for autocomplete.
+
+        Prefix matches come first, then other substring matches; each group is
+        ranked by how many occupations list the skill.
+        """
+        return self.suggestion_index.suggest(query, limit)
\ No newline at end of file
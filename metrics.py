@@ -0,0 +1,230 @@
+"""In-process metrics with Prometheus text exposition, plus a slow-request profiler.
+
+Counters and histograms are plain locked Python objects, so recording a
+sample costs a perf_counter call and one lock. Set JOB_MATCHER_METRICS=0 to
+turn stage timers into no-ops. Under gunicorn every worker keeps its own
+registry, and /metrics reports the worker that served the scrape.
+"""
+import os
+import random
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter as StackCounter
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Seconds; fine-grained at the low end for per-stage timings
+LATENCY_BUCKETS = [0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10]
+
+enabled = os.environ.get('JOB_MATCHER_METRICS', '1') != '0'
+
+class Histogram:
+    """Thread-safe cumulative histogram with fixed upper bounds."""
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = list(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        with self._lock:
+            self.counts[bisect_left(self.buckets, value)] += 1
+            self.sum += value
+            self.count += 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            labels = [str(bucket) for bucket in self.buckets] + ['+Inf']
+            return {
+                'buckets': dict(zip(labels, self.counts)),
+                'sum': self.sum,
+                'count': self.count,
+                'mean': self.sum / self.count if self.count else 0.0
+            }
+
+class Counter:
+    """Thread-safe monotonically increasing counter."""
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self.value += amount
+
+class Metric:
+    """A named family of counters or histograms, one child per label set."""
+    def __init__(self, name: str, documentation: str, kind: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.kind = kind
+        self.labelnames = tuple(labelnames)
+        self.buckets = list(buckets)
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str):
+        """The child for these label values, created on first use."""
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.get(values)
+                if child is None:
+                    child = Histogram(self.buckets) if self.kind == 'histogram' else Counter()
+                    self._children[values] = child
+        return child
+
+    def _label_text(self, values: Tuple[str, ...], extra: str = '') -> str:
+        pairs = [f'{name}="{escape(value)}"' for name, value in zip(self.labelnames, values)]
+        if extra:
+            pairs.append(extra)
+        return '{' + ','.join(pairs) + '}' if pairs else ''
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        for values, child in sorted(self._children.items()):
+            if self.kind == 'counter':
+                lines.append(f'{self.name}{self._label_text(values)} {child.value}')
+                continue
+            snapshot = child.snapshot()
+            cumulative = 0
+            for bound, count in snapshot['buckets'].items():
+                cumulative += count
+                le = f'le="{bound}"'
+                lines.append(f'{self.name}_bucket{self._label_text(values, le)} {cumulative}')
+            lines.append(f'{self.name}_sum{self._label_text(values)} {snapshot["sum"]}')
+            lines.append(f'{self.name}_count{self._label_text(values)} {snapshot["count"]}')
+        return lines
+
+def escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Metric:
+        return self.metrics.setdefault(name, Metric(name, documentation, 'counter', labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Metric:
+        return self.metrics.setdefault(name, Metric(name, documentation, 'histogram', labelnames, buckets))
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+REGISTRY = Registry()
+
+REQUEST_SECONDS = REGISTRY.histogram(
+    'job_matcher_request_seconds', 'HTTP request latency by endpoint and status.', ['endpoint', 'status'])
+STAGE_SECONDS = REGISTRY.histogram(
+    'job_matcher_stage_seconds', 'Time spent in each request processing stage.', ['stage'])
+ENCODE_CALLS = REGISTRY.counter(
+    'job_matcher_encode_calls_total', 'Embedding model encode calls.', ['source'])
+ENCODED_ITEMS = REGISTRY.counter(
+    'job_matcher_encoded_items_total', 'Texts passed to the embedding model.', ['source'])
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time the enclosed block into job_matcher_stage_seconds{stage=name}."""
+    if not enabled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.labels(name).observe(time.perf_counter() - start)
+
+def observe_stage(name: str, seconds: float):
+    """Record a stage duration measured elsewhere."""
+    if enabled:
+        STAGE_SECONDS.labels(name).observe(seconds)
+
+def count_encode(source: str, n_texts: int):
+    """Count one model encode call of n_texts texts."""
+    if enabled:
+        ENCODE_CALLS.labels(source).inc()
+        ENCODED_ITEMS.labels(source).inc(n_texts)
+
+class SlowRequestProfiler:
+    """Opt-in sampling profiler that keeps stacks only for slow requests.
+
+    A sample_rate fraction of requests is profiled. One background thread
+    samples the stacks of every thread serving a profiled request, every
+    interval_ms. When a request finishes
+    after threshold_ms or more, its samples are written as collapsed stacks
+    (one 'frame;frame;frame count' line each, ready for flamegraph tools) to
+    output_dir. Samples from fast requests are discarded.
+    """
+    def __init__(self, threshold_ms: float, sample_rate: float = 1.0, interval_ms: float = 5.0,
+                 output_dir: str = 'profiles'):
+        self.threshold_ms = threshold_ms
+        self.sample_rate = sample_rate
+        self.interval_ms = interval_ms
+        self.output_dir = output_dir
+        self._active = {}
+        self._lock = threading.Lock()
+        self._sampler = None
+        self._sampler_pid = None
+
+    def _ensure_sampler(self):
+        if self._sampler_pid == os.getpid() and self._sampler.is_alive():
+            return
+        with self._lock:
+            if self._sampler_pid != os.getpid() or not self._sampler.is_alive():
+                self._sampler = threading.Thread(target=self._run, name='slow-request-profiler', daemon=True)
+                self._sampler.start()
+                self._sampler_pid = os.getpid()
+
+    def start(self):
+        """Begin sampling the calling thread's request, if it is picked by sample_rate."""
+        if random.random() >= self.sample_rate:
+            return
+        self._ensure_sampler()
+        with self._lock:
+            self._active[threading.get_ident()] = StackCounter()
+
+    def stop(self, name: str, duration_ms: float) -> Optional[str]:
+        """Stop sampling the calling thread; returns the profile path if the request was slow."""
+        with self._lock:
+            samples = self._active.pop(threading.get_ident(), None)
+        if samples is None or duration_ms < self.threshold_ms or not samples:
+            return None
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, f'{int(time.time() * 1000)}-{os.getpid()}-{name}-{duration_ms:.0f}ms.folded')
+        with open(path, 'w') as f:
+            for stack, count in samples.most_common():
+                f.write(f'{stack} {count}\n')
+        return path
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval_ms / 1000)
+            with self._lock:
+                thread_ids = list(self._active)
+            if not thread_ids:
+                continue
+            frames = sys._current_frames()
+            for thread_id in thread_ids:
+                frame = frames.get(thread_id)
+                if frame is None:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})')
+                    frame = frame.f_back
+                stack = ';'.join(reversed(stack))
+                with self._lock:
+                    samples = self._active.get(thread_id)
+                    if samples is not None:
+                        samples[stack] += 1
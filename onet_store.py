@@ -0,0 +1,342 @@
+"""Compact on-disk O*NET catalog.
+
+Builds a SQLite store from the O*NET database text (tab-delimited) or CSV
+exports, plus optional JSONL job postings, and reads it back lazily.
+
+Every skill/ability/knowledge/activity/technology name is interned once into
+a vocab table. Each job row then stores its categories as ragged int32 ID
+arrays (one BLOB per category), instead of Python lists of strings.
+OnetStore exposes the store as a read-only mapping of job_id -> job dict, in
+the same shape as JobMatcher.load_onet_data. Rows are decoded on access, so
+callers only pay for the jobs they touch.
+
+    python onet_store.py build db_29_0_text/ onet.sqlite --postings postings.jsonl
+    python onet_store.py report onet.sqlite
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from typing import Dict, Iterator, List, Optional, Tuple
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+STORE_FORMAT_VERSION = 1
+
+LIST_CATEGORIES = ['skills', 'abilities', 'knowledge', 'work_activities', 'technology_skills', 'tools_used']
+
+# O*NET files rated per element (Scale ID IM = importance, 1-5)
+RATED_FILES = {
+    'skills': 'Skills',
+    'abilities': 'Abilities',
+    'knowledge': 'Knowledge',
+    'work_activities': 'Work Activities'
+}
+
+# O*NET files listing example technologies/tools per occupation
+EXAMPLE_FILES = {
+    'technology_skills': ['Technology Skills'],
+    'tools_used': ['Tools Used', 'Tools and Technology']
+}
+
+def find_export(source_dir: str, name: str) -> Optional[str]:
+    """Return the path of an O*NET export by base name, as .txt or .csv."""
+    for extension in ('.txt', '.csv'):
+        path = os.path.join(source_dir, name + extension)
+        if os.path.exists(path):
+            return path
+    return None
+
+def read_export(path: str) -> Iterator[Dict[str, str]]:
+    """Stream rows of an O*NET export as dicts keyed by column header."""
+    delimiter = ',' if path.endswith('.csv') else '\t'
+    with open(path, newline='', encoding='utf-8') as f:
+        yield from csv.DictReader(f, delimiter=delimiter)
+
+def encode_ids(ids: List[int]) -> bytes:
+    return np.array(ids, dtype=np.int32).tobytes()
+
+def decode_ids(blob: bytes) -> np.ndarray:
+    return np.frombuffer(blob, dtype=np.int32)
+
+def load_onet_exports(source_dir: str, min_importance: float = 3.0) -> Dict[str, Dict]:
+    """Read O*NET exports into job dicts shaped like JobMatcher.load_onet_data.
+
+    Rated categories keep elements with importance >= min_importance, most
+    important first; suppressed estimates are skipped.
+    """
+    occupations = {}
+    for row in read_export(find_export(source_dir, 'Occupation Data')):
+        occupations[row['O*NET-SOC Code']] = {
+            'title': row['Title'],
+            'description': row['Description'],
+            **{category: [] for category in LIST_CATEGORIES},
+            'task_ratings': {}
+        }
+
+    for category, name in RATED_FILES.items():
+        path = find_export(source_dir, name)
+        if path is None:
+            continue
+        rated = defaultdict(list)
+        for row in read_export(path):
+            if row['Scale ID'] != 'IM' or row.get('Recommend Suppress') == 'Y':
+                continue
+            importance = float(row['Data Value'])
+            if importance >= min_importance:
+                rated[row['O*NET-SOC Code']].append((-importance, row['Element Name']))
+        for code, elements in rated.items():
+            if code in occupations:
+                occupations[code][category] = [name for _, name in sorted(elements)]
+
+    for category, names in EXAMPLE_FILES.items():
+        path = next((p for p in (find_export(source_dir, name) for name in names) if p), None)
+        if path is None:
+            continue
+        for row in read_export(path):
+            job = occupations.get(row['O*NET-SOC Code'])
+            if job is not None and row['Example'] not in job[category]:
+                job[category].append(row['Example'])
+
+    statements_path = find_export(source_dir, 'Task Statements')
+    ratings_path = find_export(source_dir, 'Task Ratings')
+    if statements_path and ratings_path:
+        tasks = {row['Task ID']: row['Task'] for row in read_export(statements_path)}
+        for row in read_export(ratings_path):
+            job = occupations.get(row['O*NET-SOC Code'])
+            if job is not None and row['Scale ID'] == 'IM' and row['Task ID'] in tasks:
+                job['task_ratings'][tasks[row['Task ID']]] = float(row['Data Value'])
+
+    return occupations
+
+def posting_error(posting) -> Optional[str]:
+    """Why posting cannot be stored, or None if it can."""
+    if not isinstance(posting, dict):
+        return "not a JSON object"
+    if posting.get('job_id') in (None, ''):
+        return "missing job_id"
+    if not isinstance(posting.get('title'), str) or not posting['title']:
+        return "missing title"
+    if not isinstance(posting.get('description', ''), str):
+        return "description must be a string"
+    for category in LIST_CATEGORIES:
+        items = posting.get(category, [])
+        if not isinstance(items, list) or not all(isinstance(item, str) for item in items):
+            return f"{category} must be a list of strings"
+    return None
+
+def read_postings(path: str) -> Iterator[Tuple[str, Dict]]:
+    """Stream (job_id, job dict) pairs from a JSONL file of job postings.
+
+    Lines that are not valid postings are skipped with a warning naming the
+    line number, so one bad line does not abort the build.
+    """
+    with open(path) as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                posting = json.loads(line)
+            except ValueError as e:
+                logger.warning("%s:%d: skipping posting: invalid JSON (%s)", path, line_number, e)
+                continue
+            error = posting_error(posting)
+            if error:
+                logger.warning("%s:%d: skipping posting: %s", path, line_number, error)
+                continue
+            job_id = str(posting.pop('job_id'))
+            yield job_id, posting
+
+def build_store(store_path: str, jobs: Iterator[Tuple[str, Dict]], source: str = ''):
+    """Write jobs into a fresh SQLite store with interned skill IDs."""
+    tmp_path = store_path + '.tmp'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    conn = sqlite3.connect(tmp_path)
+    conn.executescript(f'''
+        CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+        CREATE TABLE vocab (id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL);
+        CREATE TABLE jobs (
+            row INTEGER PRIMARY KEY,
+            job_id TEXT UNIQUE NOT NULL,
+            title TEXT NOT NULL,
+            description TEXT NOT NULL,
+            {', '.join(f'{category} BLOB NOT NULL' for category in LIST_CATEGORIES)},
+            task_ratings TEXT NOT NULL
+        );
+    ''')
+
+    vocab = {}
+    def intern(names: List[str]) -> bytes:
+        ids = []
+        for name in names:
+            if name not in vocab:
+                vocab[name] = len(vocab)
+            ids.append(vocab[name])
+        return encode_ids(ids)
+
+    rows = (
+        (job_id, job['title'], job.get('description', ''),
+         *[intern(job.get(category, [])) for category in LIST_CATEGORIES],
+         json.dumps(job.get('task_ratings', {})))
+        for job_id, job in jobs
+    )
+    placeholders = ', '.join('?' * (len(LIST_CATEGORIES) + 4))
+    conn.executemany(
+        f"INSERT INTO jobs (job_id, title, description, {', '.join(LIST_CATEGORIES)}, task_ratings) "
+        f"VALUES ({placeholders})", rows
+    )
+    conn.executemany("INSERT INTO vocab (id, name) VALUES (?, ?)", ((i, name) for name, i in vocab.items()))
+    conn.executemany("INSERT INTO meta (key, value) VALUES (?, ?)", [
+        ('format_version', str(STORE_FORMAT_VERSION)),
+        ('built_at', str(int(time.time()))),
+        ('source', source)
+    ])
+    conn.commit()
+    conn.close()
+    os.replace(tmp_path, store_path)
+
+class OnetStore:
+    """Read-only, lazily decoded mapping of job_id -> job dict backed by SQLite.
+
+    Opening the store loads only the job IDs and the interned vocabulary. Job
+    rows are read and decoded on access.
+    """
+    def __init__(self, store_path: str):
+        self.store_path = store_path
+        # Shared across Flask request threads; the lock serializes cursor use.
+        # SQLite connections must not cross fork(), so each process opens its own.
+        self._conn = None
+        self._conn_pid = None
+        self._lock = threading.Lock()
+        with self._lock:
+            conn = self._connection()
+            meta = dict(conn.execute("SELECT key, value FROM meta"))
+            if int(meta.get('format_version', 0)) != STORE_FORMAT_VERSION:
+                raise ValueError(f"Unsupported O*NET store format in {store_path}")
+            self.vocab = [name for (name,) in conn.execute("SELECT name FROM vocab ORDER BY id")]
+            rows = conn.execute("SELECT row, job_id FROM jobs ORDER BY row").fetchall()
+        self.job_ids = [job_id for _, job_id in rows]
+        self._rows = {job_id: row for row, job_id in rows}
+        self.meta = meta
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(f'file:{self.store_path}?mode=ro', uri=True, check_same_thread=False)
+
+    def _connection(self) -> sqlite3.Connection:
+        """This process's shared lookup connection; call with self._lock held."""
+        if self._conn_pid != os.getpid():
+            self._conn = self._connect()
+            self._conn_pid = os.getpid()
+        return self._conn
+
+    def _decode(self, record: Tuple) -> Dict:
+        title, description = record[0], record[1]
+        job = {'title': title, 'description': description}
+        for category, blob in zip(LIST_CATEGORIES, record[2:-1]):
+            job[category] = [self.vocab[skill_id] for skill_id in decode_ids(blob)]
+        job['task_ratings'] = json.loads(record[-1])
+        return job
+
+    def __getitem__(self, job_id: str) -> Dict:
+        row = self._rows[job_id]
+        with self._lock:
+            record = self._connection().execute(
+                f"SELECT title, description, {', '.join(LIST_CATEGORIES)}, task_ratings FROM jobs WHERE row = ?", (row,)
+            ).fetchone()
+        return self._decode(record)
+
+    def get(self, job_id: str, default=None):
+        return self[job_id] if job_id in self._rows else default
+
+    def __contains__(self, job_id) -> bool:
+        return job_id in self._rows
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.job_ids)
+
+    def __len__(self) -> int:
+        return len(self.job_ids)
+
+    def keys(self) -> List[str]:
+        return list(self.job_ids)
+
+    def items(self) -> Iterator[Tuple[str, Dict]]:
+        """Stream every (job_id, job dict) in row order with a single scan.
+
+        The scan uses its own connection so it never holds the lookup lock.
+        """
+        conn = self._connect()
+        try:
+            records = conn.execute(
+                f"SELECT job_id, title, description, {', '.join(LIST_CATEGORIES)}, task_ratings FROM jobs ORDER BY row"
+            )
+            for record in records:
+                yield record[0], self._decode(record[1:])
+        finally:
+            conn.close()
+
+    def values(self) -> Iterator[Dict]:
+        for _, job in self.items():
+            yield job
+
+def report(store_path: str) -> Dict:
+    """Compare load time and Python heap of the store against a plain dict of the same jobs."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    store = OnetStore(store_path)
+    store_seconds = time.perf_counter() - start
+    store_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    as_dict = dict(store.items())
+    dict_seconds = time.perf_counter() - start
+    dict_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    return {
+        'jobs': len(as_dict),
+        'vocabulary': len(store.vocab),
+        'store_file_mb': os.path.getsize(store_path) / 1e6,
+        'store_open_seconds': store_seconds,
+        'store_heap_mb': store_bytes / 1e6,
+        'dict_load_seconds': dict_seconds,
+        'dict_heap_mb': dict_bytes / 1e6
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or inspect the compact O*NET store.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help="Ingest O*NET exports into a store")
+    build.add_argument('source_dir', help="Directory of O*NET text/CSV exports")
+    build.add_argument('store_path')
+    build.add_argument('--postings', help="JSONL file of extra job postings with a job_id field")
+    build.add_argument('--min-importance', type=float, default=3.0)
+    inspect = commands.add_parser('report', help="Report store size, load time and memory")
+    inspect.add_argument('store_path')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s %(message)s')
+
+    if args.command == 'build':
+        start = time.perf_counter()
+        occupations = load_onet_exports(args.source_dir, args.min_importance)
+        jobs = occupations.items()
+        if args.postings:
+            jobs = (job for source in (occupations.items(), read_postings(args.postings)) for job in source)
+        build_store(args.store_path, jobs, source=os.path.abspath(args.source_dir))
+        print(f"Built {args.store_path} in {time.perf_counter() - start:.1f}s")
+    else:
+        for key, value in report(args.store_path).items():
+            print(f"{key}: {value:.3f}" if isinstance(value, float) else f"{key}: {value}")
+
+if __name__ == '__main__':
+    main()
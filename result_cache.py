@@ -0,0 +1,292 @@
+"""Durable match-result cache and session store in job_matcher.db.
+
+Match results are stored in a match_cache table keyed by a hash of the
+canonical skill set, job preference, top_k and the catalog and model
+versions, so a repeat query is answered without running the model. Rows
+written for another catalog or model version can never be hit and are
+pruned on startup and whenever set_catalog_version moves to a new
+catalog. Live catalog updates change the catalog version, so callers pass
+the version their results were computed against. The writer also keeps
+match_cache under max_rows, evicting the oldest rows first. Sessions use the existing sessions table, so a page
+reload can fetch its last results by session_id.
+
+Reads use one connection per process and thread. Writes are queued and
+committed in batches by a background thread, off the request path. The
+database runs in WAL mode so those writes never block readers.
+"""
+import hashlib
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from embedding_cache import normalize_text, skills_text
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS sessions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        session_id TEXT UNIQUE NOT NULL,
+        user_skills TEXT NOT NULL,
+        job_matches TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE TABLE IF NOT EXISTS match_cache (
+        cache_key TEXT PRIMARY KEY,
+        catalog_version TEXT NOT NULL,
+        model_version TEXT NOT NULL,
+        job_matches TEXT NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE INDEX IF NOT EXISTS idx_match_cache_versions ON match_cache (catalog_version, model_version);
+'''
+
+# Lookup columns of the other session-scoped tables, when the database has them
+SESSION_INDEXES = {
+    'job_applications': 'CREATE INDEX IF NOT EXISTS idx_job_applications_session ON job_applications (session_id)',
+    'course_recommendations': 'CREATE INDEX IF NOT EXISTS idx_course_recommendations_session ON course_recommendations (session_id)'
+}
+
+MATCH_INSERT = ("INSERT OR REPLACE INTO match_cache (cache_key, catalog_version, model_version, job_matches) "
+                "VALUES (?, ?, ?, ?)")
+SESSION_UPSERT = ("INSERT INTO sessions (session_id, user_skills, job_matches) VALUES (?, ?, ?) "
+                  "ON CONFLICT(session_id) DO UPDATE SET user_skills = excluded.user_skills, "
+                  "job_matches = excluded.job_matches, updated_at = CURRENT_TIMESTAMP")
+
+def match_key(user_skills: List[str], job_preference: str, top_k: int,
+              catalog_version: str, model_version: str) -> str:
+    """Cache key of one find_matches call, over the same normalized text the model encodes."""
+    payload = json.dumps([skills_text(user_skills), normalize_text(job_preference), top_k,
+                          catalog_version, model_version])
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+class ResultCache:
+    """Match results and sessions persisted in SQLite, written in the background."""
+    def __init__(self, db_path: str, catalog_version: str, model_version: str,
+                 max_batch_size: int = 256, max_wait_ms: float = 50.0, max_rows: int = 100000,
+                 evict_check_interval: int = 1000):
+        self.db_path = db_path
+        self.catalog_version = catalog_version
+        self.model_version = model_version
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.max_rows = max_rows
+        # Match rows written between two size checks
+        self.evict_check_interval = evict_check_interval
+        self._unchecked_writes = 0
+        self._local = threading.local()
+        self._queue = queue.Queue()
+        # Results queued but not yet committed, so they are readable immediately
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._writer = None
+        self._writer_pid = None
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.batches = 0
+        self.evictions = 0
+
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+        tables = {name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        for table, statement in SESSION_INDEXES.items():
+            if table in tables:
+                conn.execute(statement)
+        # Invalidate results computed for another catalog or model
+        conn.execute("DELETE FROM match_cache WHERE catalog_version != ? OR model_version != ?",
+                     (catalog_version, model_version))
+        conn.commit()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _connection(self) -> sqlite3.Connection:
+        """This process and thread's connection; SQLite connections must not cross fork()."""
+        if getattr(self._local, 'pid', None) != os.getpid():
+            self._local.conn = self._connect()
+            self._local.pid = os.getpid()
+        return self._local.conn
+
+    def key(self, user_skills: List[str], job_preference: str = "", top_k: int = 5,
+            catalog_version: Optional[str] = None) -> str:
+        """Cache key under catalog_version, by default the version the cache was opened with."""
+        return match_key(user_skills, job_preference, top_k, catalog_version or self.catalog_version,
+                         self.model_version)
+
+    def get_matches(self, key: str) -> Optional[List[Dict]]:
+        """Cached find_matches result for key, or None."""
+        with self._lock:
+            cached = self._pending.get(key)
+        if cached is None:
+            row = self._connection().execute(
+                "SELECT job_matches FROM match_cache WHERE cache_key = ?", (key,)
+            ).fetchone()
+            cached = row[0] if row else None
+        with self._lock:
+            if cached is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(cached)
+
+    def put_matches(self, key: str, job_matches: List[Dict], catalog_version: Optional[str] = None):
+        """Queue a find_matches result, computed against catalog_version, for writing.
+
+        Results of a catalog version that has since been replaced are dropped.
+        """
+        if catalog_version is not None and catalog_version != self.catalog_version:
+            return
+        payload = json.dumps(job_matches)
+        with self._lock:
+            self._pending[key] = payload
+        self._submit('match', (key, catalog_version or self.catalog_version, self.model_version, payload))
+
+    def set_catalog_version(self, catalog_version: str):
+        """Switch to a new catalog version and queue deletion of every other version's rows."""
+        if catalog_version == self.catalog_version:
+            return
+        self.catalog_version = catalog_version
+        self._submit('prune', (catalog_version, self.model_version))
+
+    def save_session(self, session_id: str, user_skills: List[str], job_matches: List[Dict]):
+        """Queue an insert or update of a session's latest skills and results."""
+        if not isinstance(session_id, str):
+            raise ValueError("session_id must be a string")
+        self._submit('session', (session_id, json.dumps(user_skills), json.dumps(job_matches)))
+
+    def get_session(self, session_id: str) -> Optional[Dict]:
+        """Latest skills and results saved for session_id, or None."""
+        row = self._connection().execute(
+            "SELECT user_skills, job_matches, updated_at FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {
+            'session_id': session_id,
+            'skills': json.loads(row[0]),
+            'job_matches': json.loads(row[1]),
+            'updated_at': row[2]
+        }
+
+    def _submit(self, kind: str, params: Tuple):
+        self._ensure_writer()
+        self._queue.put((kind, params, None))
+
+    def flush(self, timeout: Optional[float] = None):
+        """Block until every write queued so far is committed."""
+        self._ensure_writer()
+        done = threading.Event()
+        self._queue.put(('flush', None, done))
+        done.wait(timeout)
+
+    def _ensure_writer(self):
+        if self._writer_pid == os.getpid() and self._writer.is_alive():
+            return
+        with self._lock:
+            if self._writer_pid != os.getpid() or not self._writer.is_alive():
+                self._writer = threading.Thread(target=self._run, name='result-cache-writer', daemon=True)
+                self._writer.start()
+                self._writer_pid = os.getpid()
+
+    def _collect_batch(self) -> List[Tuple]:
+        """Block for the first write, then gather more until full or its deadline passes."""
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait_ms / 1000
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.perf_counter()
+            try:
+                batch.append(self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        conn = self._connection()
+        while True:
+            batch = self._collect_batch()
+            matches = [params for kind, params, _ in batch if kind == 'match']
+            sessions = [params for kind, params, _ in batch if kind == 'session']
+            prunes = [params for kind, params, _ in batch if kind == 'prune']
+            try:
+                with conn:
+                    conn.executemany(MATCH_INSERT, matches)
+                    conn.executemany(SESSION_UPSERT, sessions)
+                written = len(matches) + len(sessions)
+            except sqlite3.Error as e:
+                # Retry row by row so one bad row costs only itself, not the whole batch
+                logger.warning("Result cache batch write failed (%s); retrying rows individually", e)
+                written = self._write_rows(conn, matches, sessions)
+            with self._lock:
+                self.writes += written
+                self.batches += 1
+            if prunes:
+                self._prune(conn, *prunes[-1])
+            self._unchecked_writes += len(matches)
+            if self._unchecked_writes >= self.evict_check_interval:
+                self._unchecked_writes = 0
+                self._evict(conn)
+            with self._lock:
+                for key, _, _, payload in matches:
+                    if self._pending.get(key) is payload:
+                        del self._pending[key]
+            for kind, _, done in batch:
+                if kind == 'flush':
+                    done.set()
+
+    def _prune(self, conn: sqlite3.Connection, catalog_version: str, model_version: str):
+        try:
+            with conn:
+                conn.execute("DELETE FROM match_cache WHERE catalog_version != ? OR model_version != ?",
+                             (catalog_version, model_version))
+        except sqlite3.Error as e:
+            logger.warning("Result cache prune failed: %s", e)
+
+    def _evict(self, conn: sqlite3.Connection):
+        """Trim match_cache to 90% of max_rows, oldest writes first, once it exceeds max_rows."""
+        try:
+            (count,) = conn.execute("SELECT COUNT(*) FROM match_cache").fetchone()
+            if count <= self.max_rows:
+                return
+            excess = count - int(self.max_rows * 0.9)
+            with conn:
+                # INSERT OR REPLACE gives rewritten rows a new rowid, so rowid order is write order
+                conn.execute("DELETE FROM match_cache WHERE rowid IN "
+                             "(SELECT rowid FROM match_cache ORDER BY rowid LIMIT ?)", (excess,))
+            with self._lock:
+                self.evictions += excess
+        except sqlite3.Error as e:
+            logger.warning("Result cache eviction failed: %s", e)
+
+    def _write_rows(self, conn: sqlite3.Connection, matches: List[Tuple], sessions: List[Tuple]) -> int:
+        written = 0
+        for statement, rows in ((MATCH_INSERT, matches), (SESSION_UPSERT, sessions)):
+            for params in rows:
+                try:
+                    with conn:
+                        conn.execute(statement, params)
+                    written += 1
+                except sqlite3.Error as e:
+                    # The cache is best-effort; a dropped row only costs recomputation
+                    logger.warning("Result cache write failed: %s", e)
+        return written
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'writes': self.writes,
+                'batches': self.batches,
+                'evictions': self.evictions,
+                'queue_depth': self._queue.qsize(),
+                'pending': len(self._pending)
+            }
@@ -1,19 +1,21 @@
 import PyPDF2
 import docx
 import re
-from typing import List, Set
+import time
+from typing import BinaryIO, Dict, List, Optional, Set, Union
 import os
+from skill_matcher import SkillMatcher, SkillMatch
+from metrics import observe_stage, stage
 
 class ResumeProcessor:
-    def __init__(self):
-        # spaCy is optional - use basic processing if not available
-        self.nlp = None
-        try:
-            import spacy
-            self.nlp = spacy.load("en_core_web_sm")
-        except (ImportError, OSError):
-            # Fallback to basic processing if spaCy not available
-            pass
+    def __init__(self, max_pages: int = 50, max_chars: int = 200000):
+        # Extraction stops early once either cap is reached
+        self.max_pages = max_pages
+        self.max_chars = max_chars
+        
+        # spaCy is optional and loaded on first use of self.nlp
+        self._nlp = None
+        self._nlp_loaded = False
         
         # Comprehensive skill keywords for extraction
         self.skill_keywords = {
@@ -33,75 +35,138 @@ class ResumeProcessor:
         self.all_skills = set()
         for category in self.skill_keywords.values():
             self.all_skills.update(category)
+        
+        # Compile the vocabulary once into a single-pass matcher
+        self.skill_matcher = SkillMatcher(self.skill_keywords)
+        
+        # Common skill listing patterns
+        self.skill_patterns = [
+            re.compile(r'(?:skills?|technologies?|tools?|languages?)[:\s]*([^\n.]+)', re.IGNORECASE),
+            re.compile(r'(?:experienced in|skilled in|proficient in|knowledge of)[:\s]*([^\n.]+)', re.IGNORECASE),
+            re.compile(r'•\s*([^•\n]+)', re.IGNORECASE),  # Bullet points
+            re.compile(r'-\s*([^-\n]+)', re.IGNORECASE),  # Dash points
+        ]
+        self.item_delimiters = re.compile(r'[,;|&]')
+    
+    @property
+    def nlp(self):
+        """spaCy pipeline, loaded lazily; None if spaCy or its model is not installed."""
+        if not self._nlp_loaded:
+            try:
+                import spacy
+                self._nlp = spacy.load("en_core_web_sm")
+            except (ImportError, OSError):
+                # Fallback to basic processing if spaCy not available
+                pass
+            self._nlp_loaded = True
+        return self._nlp
     
-    def extract_text(self, file_path: str) -> str:
-        """Extract text from PDF or DOCX file."""
-        file_extension = os.path.splitext(file_path)[1].lower()
+    def extract_text(self, source: Union[str, BinaryIO], file_extension: Optional[str] = None) -> str:
+        """Extract text from a PDF or DOCX file path or binary stream."""
+        return self.extract_text_with_stats(source, file_extension)['text']
+    
+    def extract_text_with_stats(self, source: Union[str, BinaryIO], file_extension: Optional[str] = None) -> Dict:
+        """Extract text plus per-page timings from a file path or binary stream.
+
+        Streams (e.g. an upload held in a BytesIO) are read in memory without a
+        temporary file; file_extension is then required, since there is no path.
+        """
+        if file_extension is None:
+            file_extension = os.path.splitext(source)[1]
+        file_extension = file_extension.lower()
+        if not file_extension.startswith('.'):
+            file_extension = '.' + file_extension
         
-        if file_extension == '.pdf':
-            return self.extract_from_pdf(file_path)
-        elif file_extension == '.docx':
-            return self.extract_from_docx(file_path)
-        else:
-            raise ValueError(f"Unsupported file format: {file_extension}")
+        with stage('text_extraction'):
+            if file_extension == '.pdf':
+                result = self.extract_from_pdf(source)
+            elif file_extension == '.docx':
+                result = self.extract_from_docx(source)
+            else:
+                raise ValueError(f"Unsupported file format: {file_extension}")
+        for page_ms in result['page_times_ms']:
+            observe_stage('text_extraction_page', page_ms / 1000)
+        return result
     
-    def extract_from_pdf(self, file_path: str) -> str:
-        """Extract text from PDF file."""
-        text = ""
+    def extract_from_pdf(self, source: Union[str, BinaryIO]) -> Dict:
+        """Extract text from a PDF, page by page, up to max_pages/max_chars."""
+        parts = []
+        page_times_ms = []
+        total_chars = 0
+        truncated = False
         try:
-            with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                for page in pdf_reader.pages:
-                    text += page.extract_text()
+            pdf_reader = PyPDF2.PdfReader(source)
+            for page_number, page in enumerate(pdf_reader.pages):
+                if page_number >= self.max_pages or total_chars >= self.max_chars:
+                    truncated = True
+                    break
+                start = time.perf_counter()
+                page_text = page.extract_text()
+                page_times_ms.append((time.perf_counter() - start) * 1000)
+                parts.append(page_text)
+                total_chars += len(page_text)
         except Exception as e:
             raise Exception(f"Error extracting text from PDF: {str(e)}")
         
-        return text
+        return self._extraction_result(parts, page_times_ms, truncated)
     
-    def extract_from_docx(self, file_path: str) -> str:
-        """Extract text from DOCX file."""
-        text = ""
+    def extract_from_docx(self, source: Union[str, BinaryIO]) -> Dict:
+        """Extract text from a DOCX, paragraph by paragraph, up to max_chars.
+
+        DOCX has no fixed pages, so the whole document counts as one page.
+        """
+        parts = []
+        total_chars = 0
+        truncated = False
+        start = time.perf_counter()
         try:
-            doc = docx.Document(file_path)
+            doc = docx.Document(source)
             for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
+                if total_chars >= self.max_chars:
+                    truncated = True
+                    break
+                parts.append(paragraph.text + "\n")
+                total_chars += len(parts[-1])
         except Exception as e:
             raise Exception(f"Error extracting text from DOCX: {str(e)}")
         
-        return text
+        return self._extraction_result(parts, [(time.perf_counter() - start) * 1000], truncated)
+    
+    def _extraction_result(self, parts: List[str], page_times_ms: List[float], truncated: bool) -> Dict:
+        """Join extracted parts once and apply the character cap."""
+        text = ''.join(parts)
+        if len(text) > self.max_chars:
+            text = text[:self.max_chars]
+            truncated = True
+        return {
+            'text': text,
+            'pages': len(page_times_ms),
+            'page_times_ms': page_times_ms,
+            'truncated': truncated
+        }
     
     def extract_skills(self, text: str) -> List[str]:
         """Extract skills from resume text using exact matching."""
-        skills = set()
-        text_lower = text.lower()
+        with stage('skill_extraction'):
+            # Word-bounded matches for every skill in one pass over the text
+            skills = {skill.title() for skill in self.skill_matcher.find_skills(text)}
         
-        # Create word boundaries for each skill to avoid partial matches
-        for skill in self.all_skills:
-            skill_lower = skill.lower()
-            # Use word boundaries to match exact skills
-            pattern = r'\b' + re.escape(skill_lower) + r'\b'
-            if re.search(pattern, text_lower):
-                skills.add(skill.title())
+            # Also extract from common skill listing patterns
+            for pattern in self.skill_patterns:
+                matches = pattern.findall(text)
+                for match in matches:
+                    # Split by common delimiters and check each item
+                    items = self.item_delimiters.split(match)
+                    for item in items:
+                        item_clean = item.strip().lower()
+                        if item_clean in self.all_skills:
+                            skills.add(item_clean.title())
         
-        # Also extract from common skill listing patterns
-        skill_patterns = [
-            r'(?:skills?|technologies?|tools?|languages?)[:\s]*([^\n.]+)',
-            r'(?:experienced in|skilled in|proficient in|knowledge of)[:\s]*([^\n.]+)',
-            r'•\s*([^•\n]+)',  # Bullet points
-            r'-\s*([^-\n]+)',  # Dash points
-        ]
-        
-        for pattern in skill_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
-                # Split by common delimiters and check each item
-                items = re.split(r'[,;|&]', match)
-                for item in items:
-                    item_clean = item.strip().lower()
-                    if item_clean in self.all_skills:
-                        skills.add(item_clean.title())
-        
-        return sorted(list(skills))
+            return sorted(list(skills))
+    
+    def find_skill_mentions(self, text: str) -> List[SkillMatch]:
+        """Return every skill occurrence with its offsets and categories."""
+        return self.skill_matcher.find_all(text)
     
 
     
@@ -0,0 +1,33 @@
+"""Append-only arrays whose published views stay valid while they grow."""
+import numpy as np
+
+class RowBuffer:
+    """Append-only rows; views handed out are never written again.
+
+    Starts as a view of the given rows, which may be a read-only mmap, and
+    copies them into a growable in-memory buffer of the given dtype on the
+    first append. Later appends write into spare capacity past the rows
+    older views can see, so appending k rows costs O(k) until the buffer
+    has to grow.
+    """
+    def __init__(self, rows: np.ndarray, growth: float = 0.25, dtype=np.float32):
+        self.rows = rows
+        self.growth = growth
+        self.dtype = dtype
+        self._buffer = None
+
+    def append(self, n_rows: int, new_rows: np.ndarray) -> np.ndarray:
+        """Write new_rows after the first n_rows rows and return a view of all of them.
+
+        n_rows is the row count of the published snapshot. Rows past it were
+        never published (a failed update), so they are overwritten.
+        """
+        k = len(new_rows)
+        if self._buffer is None or n_rows + k > len(self._buffer):
+            capacity = n_rows + k + max(k, int(n_rows * self.growth))
+            buffer = np.empty((capacity,) + self.rows.shape[1:], dtype=self.dtype)
+            buffer[:n_rows] = self.rows[:n_rows]
+            self._buffer = buffer
+        self._buffer[n_rows:n_rows + k] = new_rows
+        self.rows = self._buffer[:n_rows + k]
+        return self.rows
@@ -0,0 +1,176 @@
+import copy
+import numpy as np
+from typing import Dict, Iterable, List, Tuple
+from embedding_cache import normalize_text
+from row_buffer import RowBuffer
+
+# Alternative spellings mapped to one canonical skill name (both sides normalized)
+SKILL_ALIASES = {
+    'nodejs': 'node.js',
+    'node': 'node.js',
+    'vue': 'vue.js',
+    'vuejs': 'vue.js',
+    'reactjs': 'react',
+    'react.js': 'react',
+    'nextjs': 'next.js',
+    'nuxtjs': 'nuxt.js',
+    'golang': 'go',
+    'postgres': 'postgresql',
+    'k8s': 'kubernetes',
+    'sklearn': 'scikit-learn',
+    'scikit learn': 'scikit-learn',
+    'powerbi': 'power bi',
+    'google cloud platform': 'gcp',
+    'google cloud': 'gcp',
+    'amazon web services': 'aws',
+    'ml': 'machine learning',
+    'js': 'javascript',
+    'ts': 'typescript',
+    'cicd': 'ci/cd'
+}
+
+GAP_CATEGORIES = ['skills', 'abilities', 'knowledge', 'technology_skills']
+
+def normalize_skill(skill: str) -> str:
+    """Case- and whitespace-normalize a skill name and resolve known aliases."""
+    key = normalize_text(skill)
+    return SKILL_ALIASES.get(key, key)
+
+class SkillIndex:
+    """Catalog skills interned into integer IDs, stored as CSR arrays per category.
+
+    Each distinct spelling in the catalog gets a surface ID (so results keep
+    the catalog's own names), and each surface ID maps to a canonical ID
+    after normalize_skill. Per category, every job's entries are one
+    contiguous slice of a flat surface-ID array, in catalog order. A user's
+    skill set becomes a boolean mask over canonical IDs, so matched, missing
+    and percentage for every job come from one gather and one bincount.
+    """
+    def __init__(self, jobs: Iterable[Dict], categories: List[str] = GAP_CATEGORIES):
+        self.categories = list(categories)
+        # Interning tables; append() shares them with the indexes it creates
+        self.vocab = {}
+        self.surface_names = []
+        self._surface_index = {}
+        self._canonical = []
+        entries, lengths = self._intern(jobs)
+
+        self.canonical_ids = np.array(self._canonical, dtype=np.int32)
+        # Size of this index's vocabulary; later appends may grow the shared table
+        self.n_canonical = len(self.vocab)
+        self.n_jobs = len(lengths[self.categories[0]]) if self.categories else 0
+        self.indptr = {}
+        self.surface_ids = {}
+        self.entry_ids = {}
+        self.entry_rows = {}
+        for category in self.categories:
+            counts = np.array(lengths[category], dtype=np.int64)
+            self.indptr[category] = np.concatenate(([0], np.cumsum(counts)))
+            self.surface_ids[category] = np.array(entries[category], dtype=np.int32)
+            self.entry_ids[category] = self.canonical_ids[self.surface_ids[category]]
+            self.entry_rows[category] = np.repeat(np.arange(self.n_jobs, dtype=np.int32), counts)
+        # Growable storage behind the arrays above, shared with appended indexes
+        self._buffers = {}
+
+    def _intern(self, jobs: Iterable[Dict]) -> Tuple[Dict[str, List[int]], Dict[str, List[int]]]:
+        """Surface IDs and entry counts per category of jobs, interning spellings not seen before."""
+        entries = {category: [] for category in self.categories}
+        lengths = {category: [] for category in self.categories}
+        for job_data in jobs:
+            for category in self.categories:
+                items = job_data.get(category) or []
+                for item in items:
+                    surface_id = self._surface_index.get(item)
+                    if surface_id is None:
+                        surface_id = self._surface_index[item] = len(self.surface_names)
+                        self.surface_names.append(item)
+                        self._canonical.append(self.vocab.setdefault(normalize_skill(item), len(self.vocab)))
+                    entries[category].append(surface_id)
+                lengths[category].append(len(items))
+        return entries, lengths
+
+    def append(self, jobs: List[Dict]) -> 'SkillIndex':
+        """A new index with jobs added as rows n_jobs, n_jobs + 1, ...; this one is left unchanged.
+
+        The interning tables are shared and only grow, so IDs held by older
+        indexes stay valid. The arrays are extended in spare capacity past
+        what this index can see, so appending costs O(new entries), not a
+        copy of the index. Append only to the newest index of a chain.
+        """
+        index = copy.copy(self)
+        entries, lengths = self._intern(jobs)
+        n_surfaces = len(self.canonical_ids)
+        index.canonical_ids = self._extend('canonical_ids', self.canonical_ids,
+                                           np.array(self._canonical[n_surfaces:], dtype=np.int32))
+        index.n_canonical = len(self.vocab)
+        index.n_jobs = self.n_jobs + len(jobs)
+        index.indptr, index.surface_ids, index.entry_ids, index.entry_rows = {}, {}, {}, {}
+        for category in self.categories:
+            counts = np.array(lengths[category], dtype=np.int64)
+            surface_ids = np.array(entries[category], dtype=np.int32)
+            index.indptr[category] = self._extend(('indptr', category), self.indptr[category],
+                                                  self.indptr[category][-1] + np.cumsum(counts))
+            index.surface_ids[category] = self._extend(('surface_ids', category), self.surface_ids[category], surface_ids)
+            index.entry_ids[category] = self._extend(('entry_ids', category), self.entry_ids[category],
+                                                     index.canonical_ids[surface_ids])
+            index.entry_rows[category] = self._extend(('entry_rows', category), self.entry_rows[category],
+                                                      np.repeat(np.arange(self.n_jobs, index.n_jobs, dtype=np.int32), counts))
+        return index
+
+    def _extend(self, key, array: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """array followed by values, written into the shared buffer for key."""
+        buffer = self._buffers.get(key)
+        if buffer is None:
+            buffer = self._buffers[key] = RowBuffer(array, dtype=array.dtype)
+        return buffer.append(len(array), values)
+
+    def user_mask(self, user_skills: List[str]) -> np.ndarray:
+        """Boolean mask over canonical IDs of the user's skills; unknown skills are ignored."""
+        mask = np.zeros(self.n_canonical, dtype=bool)
+        ids = [skill_id for skill_id in (self.vocab.get(key) for key in map(normalize_skill, user_skills))
+               if skill_id is not None and skill_id < self.n_canonical]
+        mask[ids] = True
+        return mask
+
+    def _split(self, category: str, row: int, mask: np.ndarray) -> Tuple[List[str], List[str]]:
+        """(matched, missing) names of one job category, in catalog order."""
+        start, end = self.indptr[category][row], self.indptr[category][row + 1]
+        have = mask[self.entry_ids[category][start:end]]
+        names = [self.surface_names[surface_id] for surface_id in self.surface_ids[category][start:end]]
+        matched = [name for name, hit in zip(names, have) if hit]
+        missing = [name for name, hit in zip(names, have) if not hit]
+        return matched, missing
+
+    def skills_match(self, row: int, mask: np.ndarray, category: str = 'skills') -> Dict:
+        """Matched skills of one catalog row with match percentage and counts."""
+        matched, missing = self._split(category, row, mask)
+        total = len(matched) + len(missing)
+        return {
+            'matched_skills': matched,
+            'match_percentage': (len(matched) / total) * 100 if total else 0,
+            'total_required': total,
+            'total_matched': len(matched)
+        }
+
+    def missing_skills(self, row: int, mask: np.ndarray) -> Dict:
+        """The user's missing items of one catalog row, per category."""
+        return {category: self._split(category, row, mask)[1] for category in self.categories}
+
+    def match_counts(self, mask: np.ndarray, category: str) -> np.ndarray:
+        """(n_jobs,) number of the category's entries each job shares with the mask."""
+        hits = mask[self.entry_ids[category]]
+        return np.bincount(self.entry_rows[category][hits], minlength=self.n_jobs)
+
+    def required_counts(self, category: str) -> np.ndarray:
+        """(n_jobs,) number of entries each job lists in the category."""
+        return np.diff(self.indptr[category])
+
+    def catalog_gap(self, mask: np.ndarray) -> Dict[str, Dict[str, np.ndarray]]:
+        """Matched, missing and match percentage per category for every job at once."""
+        gap = {}
+        for category in self.categories:
+            required = self.required_counts(category)
+            matched = self.match_counts(mask, category)
+            percentage = np.divide(matched * 100.0, required, out=np.zeros(self.n_jobs), where=required > 0)
+            gap[category] = {'matched': matched, 'missing': required - matched, 'match_percentage': percentage}
+        return gap
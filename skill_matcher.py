@@ -0,0 +1,109 @@
+from collections import deque
+from typing import Dict, Iterator, List, NamedTuple, Set, Tuple
+
+class SkillMatch(NamedTuple):
+    skill: str
+    start: int
+    end: int
+    categories: Tuple[str, ...]
+
+def is_word_char(char: str) -> bool:
+    """Same definition of a word character as the re module's \\w."""
+    return char.isalnum() or char == '_'
+
+class SkillMatcher:
+    """Aho-Corasick automaton over a skill vocabulary.
+
+    The vocabulary is compiled once into a trie with failure links, so a single
+    pass over the text finds every occurrence of every skill regardless of
+    vocabulary size. A match is only reported when it sits on word boundaries,
+    with the same semantics as wrapping the skill in \\b...\\b. Matching is
+    case-insensitive; offsets refer to the original text.
+    """
+    def __init__(self, skill_categories: Dict[str, List[str]]):
+        self.skills = []
+        self.categories = []
+        skill_ids = {}
+        for category, skills in skill_categories.items():
+            for skill in skills:
+                skill = skill.lower()
+                if not skill:
+                    continue
+                if skill not in skill_ids:
+                    skill_ids[skill] = len(self.skills)
+                    self.skills.append(skill)
+                    self.categories.append([])
+                if category not in self.categories[skill_ids[skill]]:
+                    self.categories[skill_ids[skill]].append(category)
+        self.categories = [tuple(categories) for categories in self.categories]
+        self._build()
+
+    def _build(self):
+        """Build the goto trie, failure links and merged output sets."""
+        self._goto = [{}]
+        outputs = [[]]
+        for skill_id, skill in enumerate(self.skills):
+            node = 0
+            for char in skill:
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto[node][char] = next_node
+                    self._goto.append({})
+                    outputs.append([])
+                node = next_node
+            outputs[node].append(skill_id)
+
+        # Breadth-first so every failure target is finished before it is used
+        self._fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                if node:
+                    fail = self._fail[node]
+                    while fail and char not in self._goto[fail]:
+                        fail = self._fail[fail]
+                    self._fail[child] = self._goto[fail].get(char, 0)
+                outputs[child] = outputs[child] + outputs[self._fail[child]]
+                queue.append(child)
+        self._outputs = [tuple(output) for output in outputs]
+
+    def iter_matches(self, text: str) -> Iterator[SkillMatch]:
+        """Yield every word-bounded skill occurrence in text, in order of end offset."""
+        lowered = text.lower()
+        # Some characters lowercase to several ('İ' -> 'i̇'); map offsets in lowered back to text
+        origin = None if len(lowered) == len(text) else [index for index, char in enumerate(text) for _ in char.lower()]
+        text = lowered
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        skills, categories = self.skills, self.categories
+        length = len(text)
+        node = 0
+        for position, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if not outputs[node]:
+                continue
+            end = position + 1
+            after_is_word = end < length and is_word_char(text[end])
+            for skill_id in outputs[node]:
+                skill = skills[skill_id]
+                start = end - len(skill)
+                if is_word_char(skill[-1]) == after_is_word:
+                    continue
+                before_is_word = start > 0 and is_word_char(text[start - 1])
+                if is_word_char(skill[0]) == before_is_word:
+                    continue
+                if origin is None:
+                    yield SkillMatch(skill, start, end, categories[skill_id])
+                else:
+                    yield SkillMatch(skill, origin[start], origin[end - 1] + 1, categories[skill_id])
+
+    def find_all(self, text: str) -> List[SkillMatch]:
+        """Return every word-bounded skill occurrence in text."""
+        return list(self.iter_matches(text))
+
+    def find_skills(self, text: str) -> Set[str]:
+        """Return the distinct skills that occur in text."""
+        return {match.skill for match in self.iter_matches(text)}
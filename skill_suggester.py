@@ -0,0 +1,221 @@
+from bisect import bisect_left
+from collections import defaultdict
+import heapq
+import numpy as np
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+SUGGESTION_CATEGORIES = ('skills', 'technology_skills')
+
+def job_suggestion_skills(job_data: Dict, categories: Iterable[str] = SUGGESTION_CATEGORIES) -> Set[str]:
+    """Distinct skills one job adds to suggestion popularity."""
+    skills = set()
+    for category in categories:
+        skills.update(job_data.get(category, []))
+    return skills
+
+def count_changes(removed: Iterable[Dict], added: Iterable[Dict]) -> Dict[str, int]:
+    """Net change in the number of jobs listing each skill; unchanged skills are omitted."""
+    deltas = defaultdict(int)
+    for jobs, delta in ((removed, -1), (added, 1)):
+        for job_data in jobs:
+            for skill in job_suggestion_skills(job_data):
+                deltas[skill] += delta
+    return {skill: delta for skill, delta in deltas.items() if delta}
+
+class NgramTable:
+    """N-gram posting lists over stable skill IDs, grown as new skills appear.
+
+    Index rebuilds only change popularity, so they reuse these postings and
+    just map stable IDs to ranks instead of recomputing every name's n-grams.
+    Skills are never removed; ranked_postings skips those not in the index.
+    """
+    def __init__(self, ngram_size: int = 3):
+        self.ngram_size = ngram_size
+        self.ids = {}
+        self.postings = {}
+
+    def add(self, skills: Iterable[str]):
+        """Intern skills not seen before and add their n-grams of lengths 1..ngram_size."""
+        postings = defaultdict(list)
+        for skill in skills:
+            if skill in self.ids:
+                continue
+            skill_id = self.ids[skill] = len(self.ids)
+            name = skill.lower()
+            grams = set()
+            for size in range(1, self.ngram_size + 1):
+                grams.update(name[i:i + size] for i in range(len(name) - size + 1))
+            for gram in grams:
+                postings[gram].append(skill_id)
+        for gram, ids in postings.items():
+            ids = np.array(ids, dtype=np.int32)
+            self.postings[gram] = ids if gram not in self.postings else np.concatenate((self.postings[gram], ids))
+
+    def ranked_postings(self, ranked_skills: List[str]) -> Dict[str, np.ndarray]:
+        """gram -> sorted ranks of ranked_skills containing it, ranks being positions in ranked_skills."""
+        self.add(ranked_skills)
+        rank = np.full(len(self.ids), len(ranked_skills), dtype=np.int32)
+        rank[[self.ids[skill] for skill in ranked_skills]] = np.arange(len(ranked_skills), dtype=np.int32)
+        ranked = {}
+        for gram, ids in self.postings.items():
+            ranks = np.sort(rank[ids])
+            ranks = ranks[:np.searchsorted(ranks, len(ranked_skills))]
+            if len(ranks):
+                ranked[gram] = ranks
+        return ranked
+
+class SkillSuggestionIndex:
+    """Autocomplete index over the skill vocabulary, ranked by popularity.
+
+    Skills get integer IDs in rank order (most occupations first, then
+    alphabetical), so every posting list below is already sorted by rank.
+    Prefix matches come from a sorted array of lowercased names; infix matches
+    come from an n-gram index of lengths 1..ngram_size. Prefix matches rank
+    ahead of infix matches.
+    """
+    def __init__(self, skill_counts: Dict[str, int], ngram_size: int = 3, grams: Optional['NgramTable'] = None):
+        self.ngram_size = ngram_size
+        # Shared with indexes rebuilt from this one, so they skip n-grams already computed
+        self.grams = NgramTable(ngram_size) if grams is None else grams
+        self.skill_counts = dict(skill_counts)
+        self.skills = sorted(skill_counts, key=lambda skill: (-skill_counts[skill], skill))
+        self.counts = [skill_counts[skill] for skill in self.skills]
+        self._lowered = [skill.lower() for skill in self.skills]
+
+        # Lowercased names in sorted order, for bisecting prefix ranges
+        by_name = sorted(range(len(self.skills)), key=lambda skill_id: self._lowered[skill_id])
+        self._sorted_names = [self._lowered[skill_id] for skill_id in by_name]
+        self._sorted_ids = np.array(by_name, dtype=np.int32)
+
+        self._postings = self.grams.ranked_postings(self.skills)
+
+    @classmethod
+    def from_catalog(cls, onet_data: Dict, categories: Iterable[str] = SUGGESTION_CATEGORIES) -> 'SkillSuggestionIndex':
+        """Build the index with popularity = number of occupations listing each skill."""
+        counts = defaultdict(int)
+        for job_data in onet_data.values():
+            for skill in job_suggestion_skills(job_data, categories):
+                counts[skill] += 1
+        return cls(counts)
+
+    def with_changes(self, removed: Iterable[Dict], added: Iterable[Dict]):
+        """An index with popularity adjusted for removed and added jobs; self is unchanged.
+
+        Changed skills go into a SkillSuggestionOverlay on top of this index,
+        so an update costs O(changed skills) instead of a rebuild.
+        """
+        return SkillSuggestionOverlay(self, {}).with_changes(removed, added)
+
+    def suggest(self, query: str, limit: int = 10) -> List[str]:
+        """Return up to limit skills containing query, prefix matches first, by popularity."""
+        query = query.lower()
+        if not query:
+            return self.skills[:limit]
+
+        start = bisect_left(self._sorted_names, query)
+        end = bisect_left(self._sorted_names, query + '\U0010ffff', start)
+        prefix_ids = self._sorted_ids[start:end]
+        if len(prefix_ids) > limit:
+            prefix_ids = np.partition(prefix_ids, limit - 1)[:limit]
+        results = [int(skill_id) for skill_id in np.sort(prefix_ids)]
+
+        if len(results) < limit:
+            results.extend(self._infix_matches(query, limit - len(results)))
+
+        return [self.skills[skill_id] for skill_id in results]
+
+    def _infix_matches(self, query: str, limit: int) -> List[int]:
+        """Skills containing query but not starting with it, best ranked first."""
+        if len(query) <= self.ngram_size:
+            posting = self._postings.get(query)
+            exact = True
+        else:
+            # Scan the rarest n-gram's posting list and verify each candidate
+            grams = [query[i:i + self.ngram_size] for i in range(len(query) - self.ngram_size + 1)]
+            postings = [self._postings.get(gram) for gram in grams]
+            if any(posting is None for posting in postings):
+                return []
+            posting = min(postings, key=len)
+            exact = False
+        if posting is None:
+            return []
+
+        matches = []
+        for offset in range(0, len(posting), 64):
+            for skill_id in posting[offset:offset + 64].tolist():
+                name = self._lowered[skill_id]
+                if name.startswith(query) or (not exact and query not in name):
+                    continue
+                matches.append(skill_id)
+                if len(matches) == limit:
+                    return matches
+        return matches
+
+class SkillSuggestionOverlay:
+    """SkillSuggestionIndex results with some skill counts replaced, without a rebuild.
+
+    Skills whose count differs from the base index are kept in overrides, as
+    skill -> (count, lowercased name); a count of 0 removes the skill.
+    suggest() takes the base results, drops overridden skills, adds matching
+    overridden skills and re-sorts with the base's ranking rules, so results
+    equal those of a full rebuild. Each query scans the overrides, so once they
+    exceed max(min_rebuild, 10% of the vocabulary), with_changes
+    folds them into a new base index. An update costs O(overrides); a fold
+    is a rebuild, O(vocabulary).
+    """
+    min_rebuild = 2000
+
+    def __init__(self, base: SkillSuggestionIndex, overrides: Dict[str, Tuple[int, str]]):
+        self.base = base
+        self.overrides = overrides
+
+    def count(self, skill: str) -> int:
+        """Current popularity of skill; 0 if no job lists it."""
+        if skill in self.overrides:
+            return self.overrides[skill][0]
+        return self.base.skill_counts.get(skill, 0)
+
+    def with_changes(self, removed: Iterable[Dict], added: Iterable[Dict]):
+        """An overlay, or a rebuilt index, with popularity adjusted for removed and added jobs."""
+        deltas = count_changes(removed, added)
+        if not deltas:
+            return self
+        overrides = dict(self.overrides)
+        for skill, delta in deltas.items():
+            count = self.count(skill) + delta
+            if count == self.base.skill_counts.get(skill, 0):
+                overrides.pop(skill, None)
+            else:
+                overrides[skill] = (max(count, 0), skill.lower())
+        if len(overrides) > max(self.min_rebuild, len(self.base.skill_counts) // 10):
+            skill_counts = dict(self.base.skill_counts)
+            for skill, (count, _) in overrides.items():
+                if count > 0:
+                    skill_counts[skill] = count
+                else:
+                    skill_counts.pop(skill, None)
+            return SkillSuggestionIndex(skill_counts, self.base.ngram_size, self.base.grams)
+        return SkillSuggestionOverlay(self.base, overrides)
+
+    def suggest(self, query: str, limit: int = 10) -> List[str]:
+        """Same results as SkillSuggestionIndex.suggest on the adjusted counts."""
+        lowered = query.lower()
+        found = [(skill, count, name) for skill, (count, name) in self.overrides.items() if lowered in name]
+        if not found:
+            return self.base.suggest(query, limit)
+        # Overridden skills the base index may still return
+        hidden = sum(skill in self.base.skill_counts for skill, _, _ in found)
+        # (is_infix, -count, skill) sorts like the base index ranks
+        matches = [(not name.startswith(lowered), -count, skill) for skill, count, name in found if count > 0]
+
+        # Fetch base results until limit of them survive; at most hidden of them can be dropped
+        size = limit
+        while True:
+            base = self.base.suggest(query, size)
+            kept = [skill for skill in base if skill not in self.overrides]
+            if len(kept) >= limit or len(base) < size or size >= limit + hidden:
+                break
+            size = min(2 * size, limit + hidden)
+        matches.extend((not skill.lower().startswith(lowered), -self.base.skill_counts[skill], skill) for skill in kept)
+        return [skill for _, _, skill in heapq.nsmallest(limit, matches)]
+
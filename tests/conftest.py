@@ -0,0 +1,7 @@
+"""Make the top-level modules and benchmarks/synthetic.py importable from the tests."""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
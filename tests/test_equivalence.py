@@ -0,0 +1,254 @@
+"""The optimized code paths return exactly what the code they replaced returned.
+
+Each test compares a fast path against a straightforward reference
+implementation on deterministic synthetic input.
+"""
+import random
+import re
+
+import pytest
+
+from catalog_snapshot import CatalogOverlay
+from catalog_sync import CatalogChangeLog, CatalogSync
+from job_matcher import JobMatcher
+from resume_processor import ResumeProcessor
+from skill_index import GAP_CATEGORIES, SKILL_ALIASES, SkillIndex, normalize_skill
+from skill_matcher import SkillMatcher
+from skill_suggester import SkillSuggestionIndex, SkillSuggestionOverlay
+from synthetic import StubEncoder, make_catalog, make_profiles
+
+SEPARATORS = [' ', ', ', '. ', '/', '-', '_', '(', ')', '\n', '', '+', '#', ' and ']
+
+def regex_find_skills(skills, text):
+    """The extract_skills loop SkillMatcher replaced: one \\b...\\b search per skill."""
+    text_lower = text.lower()
+    return {skill.lower() for skill in skills
+            if re.search(r'\b' + re.escape(skill.lower()) + r'\b', text_lower)}
+
+def random_text(vocabulary, rng, n_tokens=300):
+    """Skills, their fragments and filler words joined by separators that do and do not form word boundaries."""
+    tokens = []
+    for _ in range(n_tokens):
+        roll = rng.random()
+        if roll < 0.4:
+            token = rng.choice(vocabulary)
+        elif roll < 0.55:
+            skill = rng.choice(vocabulary)
+            token = skill[:rng.randint(1, len(skill))]
+        else:
+            # 'İ' lowercases to two characters, which shifts offsets in text.lower()
+            token = rng.choice(['team', 'led', 'built', 'x', 'é', 'data', '2', 'SQL2', 'Ünïcode', 'İ', 'İstanbul'])
+        tokens.append(token.upper() if rng.random() < 0.2 else token)
+        tokens.append(rng.choice(SEPARATORS))
+    return ''.join(tokens)
+
+@pytest.mark.parametrize('seed', range(5))
+def test_skill_matcher_equals_regex_loop(seed):
+    rng = random.Random(seed)
+    vocabulary = sorted(ResumeProcessor().all_skills)
+    matcher = SkillMatcher({'all': vocabulary})
+    for _ in range(20):
+        text = random_text(vocabulary, rng)
+        assert matcher.find_skills(text) == regex_find_skills(vocabulary, text)
+
+def test_skill_matcher_offsets_index_original_text():
+    rng = random.Random(7)
+    vocabulary = sorted(ResumeProcessor().all_skills)
+    matcher = SkillMatcher({'all': vocabulary})
+    for _ in range(20):
+        text = random_text(vocabulary, rng)
+        matches = matcher.find_all(text)
+        assert matches
+        for match in matches:
+            assert text[match.start:match.end].lower() == match.skill
+
+def scan_suggestions(skill_counts, query, limit):
+    """Every skill containing query, prefix matches first, then by popularity and name."""
+    query = query.lower()
+    found = [(not skill.lower().startswith(query), -count, skill)
+             for skill, count in skill_counts.items() if query in skill.lower()]
+    return [skill for _, _, skill in sorted(found)[:limit]]
+
+def suggestion_queries(skills, rng, n_queries=150):
+    """Prefixes and infixes of real skill names, in mixed case, plus queries that match nothing."""
+    queries = ['', 'zzz', 'qx', ' ', 'a', 'E']
+    for _ in range(n_queries):
+        name = rng.choice(skills)
+        start = rng.randrange(len(name))
+        query = name[start:start + rng.randint(1, 6)]
+        queries.append(query.upper() if rng.random() < 0.3 else query)
+    return queries
+
+def test_suggestion_index_equals_scan():
+    rng = random.Random(0)
+    index = SkillSuggestionIndex.from_catalog(make_catalog(3000))
+    for query in suggestion_queries(list(index.skill_counts), rng):
+        for limit in (1, 10, 50):
+            assert index.suggest(query, limit) == scan_suggestions(index.skill_counts, query, limit), (query, limit)
+
+@pytest.mark.parametrize('min_rebuild', [50, 2000])
+def test_suggestion_overlay_equals_rebuild(monkeypatch, min_rebuild):
+    # 50 folds the overlay into a new index every few steps; 2000 never does
+    monkeypatch.setattr(SkillSuggestionOverlay, 'min_rebuild', min_rebuild)
+    rng = random.Random(1)
+    jobs = list(make_catalog(2000).values())
+    extra = list(make_catalog(2000, seed=5).values())
+    index = SkillSuggestionIndex.from_catalog(dict(enumerate(jobs)))
+    for step in range(150):
+        removed = [jobs.pop(rng.randrange(len(jobs))) for _ in range(rng.randint(0, 5))]
+        added = [rng.choice(extra) for _ in range(rng.randint(0, 5))]
+        jobs += added
+        index = index.with_changes(removed, added)
+        if step % 15 == 0:
+            rebuilt = SkillSuggestionIndex.from_catalog(dict(enumerate(jobs)))
+            for query in suggestion_queries(rebuilt.skills, rng, 30):
+                for limit in (1, 10, 50):
+                    assert index.suggest(query, limit) == rebuilt.suggest(query, limit), (step, query, limit)
+
+def match_results(matcher, profiles, snapshot=None):
+    results = []
+    for profile in profiles:
+        matches = matcher.find_matches(profile['skills'], profile['job_preference'], 10, snapshot=snapshot)
+        results.append([(match['job_id'], round(match['score'], 4), match['skills_match'], match['missing_skills'])
+                        for match in matches])
+    return results
+
+@pytest.mark.parametrize('compaction_fraction', [0.1, 10.0])
+def test_catalog_updates_equal_fresh_build(monkeypatch, compaction_fraction):
+    # A small top layer makes the job_id overlays merge down every few updates
+    monkeypatch.setattr(CatalogOverlay, 'min_layer', 4)
+    encoder = StubEncoder()
+    rng = random.Random(2)
+    catalog = make_catalog(1500, seed=1)
+    new_jobs = iter(make_catalog(5000, seed=2).values())
+    matcher = JobMatcher(model=encoder, onet_data=dict(catalog))
+    matcher.compaction_fraction = compaction_fraction
+    current = dict(catalog)
+    profiles = make_profiles(catalog, 10, seed=3)
+    published = []
+
+    for step in range(60):
+        job_ids = list(current)
+        changes = {job_id: next(new_jobs) for job_id in rng.sample(job_ids, rng.randint(0, 8))}
+        changes.update({job_id: None for job_id in rng.sample(job_ids, rng.randint(0, 4))})
+        changes.update({f'99-{step:04d}.{i:02d}': next(new_jobs) for i in range(rng.randint(0, 5))})
+        for job_id, job_data in changes.items():
+            current.pop(job_id, None)
+            if job_data is not None:
+                current[job_id] = job_data
+        matcher.update_catalog(changes)
+        if step % 20 == 0:
+            published.append((matcher.snapshot, match_results(matcher, profiles)))
+
+    snapshot = matcher.snapshot
+    assert list(snapshot.onet_data) == list(current)
+    assert len(snapshot.onet_data) == snapshot.n_live == len(current)
+    assert all(snapshot.job_ids[snapshot.job_index[job_id]] == job_id for job_id in current)
+    # Requests that started on an older snapshot still see it unchanged
+    for old, results in published:
+        assert match_results(matcher, profiles, old) == results
+
+    fresh = JobMatcher(model=encoder, onet_data=dict(current))
+    profiles = make_profiles(current, 20, seed=4)
+    assert match_results(matcher, profiles) == match_results(fresh, profiles)
+    for profile in profiles:
+        assert matcher.catalog_skill_gap(profile['skills'], 10) == fresh.catalog_skill_gap(profile['skills'], 10)
+    for query in ['', 'py', 'data', 'an', 'sec']:
+        assert matcher.get_skill_suggestions(query) == fresh.get_skill_suggestions(query)
+    for job_id in rng.sample(list(current), 5):
+        updated, rebuilt = (m.analyze_skill_gap(job_id, profiles[0]['skills']) for m in (matcher, fresh))
+        assert updated['current_score'] == pytest.approx(rebuilt['current_score'], abs=1e-3)
+        assert updated['missing_skills'] == rebuilt['missing_skills']
+
+def alias_catalog(n_jobs, seed):
+    """Synthetic catalog whose jobs also list skills under alias and mixed-case spellings."""
+    rng = random.Random(seed)
+    spellings = list(SKILL_ALIASES) + list(SKILL_ALIASES.values()) + ['NodeJS', ' Node.JS', 'K8S', 'GoLang']
+    catalog = make_catalog(n_jobs, seed)
+    for job_data in catalog.values():
+        for category in GAP_CATEGORIES:
+            job_data[category] = job_data[category] + rng.sample(spellings, rng.randint(0, 3))
+    return catalog, spellings
+
+def reference_gap(user_skills, job_data):
+    """Per-job loop: (matched, missing) items per gap category, in catalog order."""
+    user_keys = {normalize_skill(skill) for skill in user_skills}
+    return {category: ([item for item in job_data.get(category, []) if normalize_skill(item) in user_keys],
+                       [item for item in job_data.get(category, []) if normalize_skill(item) not in user_keys])
+            for category in GAP_CATEGORIES}
+
+def test_skill_index_equals_per_job_loop():
+    catalog, spellings = alias_catalog(400, seed=6)
+    jobs = list(catalog.values())
+    # Half built at once, half appended, as after catalog updates
+    skill_index = SkillIndex(jobs[:200]).append(jobs[200:])
+    matcher = JobMatcher(model=StubEncoder(), onet_data=catalog)
+    rng = random.Random(6)
+    for profile in make_profiles(catalog, 20, seed=6):
+        user_skills = profile['skills'] + rng.sample(spellings, 4)
+        mask = skill_index.user_mask(user_skills)
+        gap = skill_index.catalog_gap(mask)
+        expected = []
+        for row, (job_id, job_data) in enumerate(catalog.items()):
+            reference = reference_gap(user_skills, job_data)
+            matched, missing = reference['skills']
+            assert skill_index.skills_match(row, mask) == {
+                'matched_skills': matched,
+                'match_percentage': (len(matched) / len(job_data['skills'])) * 100 if job_data['skills'] else 0,
+                'total_required': len(job_data['skills']),
+                'total_matched': len(matched)
+            }
+            assert skill_index.missing_skills(row, mask) == {category: reference[category][1] for category in GAP_CATEGORIES}
+            for category, (matched, missing) in reference.items():
+                required = len(matched) + len(missing)
+                assert gap[category]['matched'][row] == len(matched)
+                assert gap[category]['missing'][row] == len(missing)
+                percentage = len(matched) * 100.0 / required if required else 0.0
+                assert gap[category]['match_percentage'][row] == percentage
+                if category == 'skills':
+                    skills_percentage = percentage
+            total_matched = sum(len(matched) for matched, _ in reference.values())
+            total_missing = sum(len(missing) for _, missing in reference.values())
+            required = total_matched + total_missing
+            coverage = total_matched * 100.0 / required if required else 0.0
+            expected.append((-coverage, total_missing, row, {
+                'job_id': job_id,
+                'title': job_data['title'],
+                'coverage_percentage': coverage,
+                'missing_count': total_missing,
+                'missing_by_category': {category: len(missing) for category, (_, missing) in reference.items()},
+                'skills_match_percentage': skills_percentage
+            }))
+        expected.sort(key=lambda item: item[:3])
+        assert matcher.catalog_skill_gap(user_skills, 10) == [item[3] for item in expected[:10]]
+
+def test_compacted_change_log_replays_to_the_same_catalog(tmp_path):
+    rng = random.Random(5)
+    catalog = make_catalog(500, seed=1)
+    new_jobs = list(make_catalog(100, seed=2).values())
+    store_dir, db_path = str(tmp_path / 'store'), str(tmp_path / 'job_matcher.db')
+    matcher = JobMatcher(model=StubEncoder(), onet_data=dict(catalog), store_dir=store_dir)
+    sync = CatalogSync(matcher, CatalogChangeLog(db_path))
+    job_ids = list(catalog)[:30]
+    for _ in range(20):
+        sync.publish({job_id: None if rng.random() < 0.2 else rng.choice(new_jobs)
+                      for job_id in rng.sample(job_ids, 6)})
+    assert len(sync.change_log.entries(0)) <= len(job_ids)
+
+    # A restart replays the compacted log without re-encoding updated jobs
+    encoder = StubEncoder()
+    restarted = JobMatcher(model=encoder, onet_data=dict(catalog), store_dir=store_dir)
+    encoded = encoder.texts
+    CatalogSync(restarted, CatalogChangeLog(db_path)).sync()
+    assert encoder.texts == encoded
+    assert restarted.catalog_version == matcher.catalog_version
+    assert list(restarted.onet_data) == list(matcher.onet_data)
+    profiles = make_profiles(catalog, 10, seed=3)
+    assert match_results(restarted, profiles) == match_results(matcher, profiles)
+
+def test_user_texts_keep_the_users_skill_order():
+    # The model is order-sensitive; only case and whitespace may be normalized
+    matcher = JobMatcher(model=StubEncoder(), onet_data=make_catalog(50))
+    assert matcher.user_texts(['SQL', ' Python ', 'Excel'], ' Data  Analyst ') == (
+        'sql python excel data analyst', 'sql python excel')
+    assert matcher.user_texts(['python', 'sql'], '') != matcher.user_texts(['sql', 'python'], '')